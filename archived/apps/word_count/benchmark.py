@@ -0,0 +1,64 @@
+import argparse
+import time
+
+import spacy
+
+from word_count import analyze_doc
+
+SAMPLE_TEXT = ("The quick brown fox jumps over the lazy dog near the river bank. "
+               "About an hour later, the tired dog walked across the field and slept above the old barn. ")
+
+def legacy_word_type(token):
+    # word_type as it was before the lookup table: the sets are rebuilt on every call.
+    word_types_mapping = {'NOUN', 'VERB', 'ADJ', 'ADV', 'ADP', 'CONJ', 'PRON', 'DET', 'SCONJ', 'INTJ', 'NUM', 'SYM', 'X'}
+    special_prepositions = {'about', 'above', 'across'}
+    if token.pos_ == 'ADP' and token.text.lower() in special_prepositions:
+        return 'Complex Preposition'
+    return token.pos_ if token.pos_ in word_types_mapping else 'Other'
+
+def legacy_analysis(doc):
+    # The analysis as process_text computed it before analyze_doc: one scan of the document per word type.
+    word_types = {wt: [token.text for token in doc if legacy_word_type(token) == wt] for wt in set(legacy_word_type(token) for token in doc)}
+    sentence_structure = {}
+    for sent in doc.sents:
+        for token in sent:
+            sentence_structure[token.dep_] = sentence_structure.get(token.dep_, 0) + 1
+    return {'words': len(doc), 'word_types': word_types, 'dependencies': sentence_structure}
+
+def best_time(function, doc, repeat):
+    # Return the fastest of repeat runs of function on the parsed document, in seconds.
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function(doc)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+def run_benchmark(nlp, sizes, repeat):
+    # Parse a document of each size once, then time only the analysis step of both implementations.
+    print(f"{'words':>8} {'legacy ms':>10} {'single-pass ms':>15} {'speedup':>8}")
+    for size in sizes:
+        text = SAMPLE_TEXT * max(1, size // len(SAMPLE_TEXT.split()))
+        nlp.max_length = max(nlp.max_length, len(text) + 1)
+        doc = nlp(text)
+
+        expected, actual = legacy_analysis(doc), analyze_doc(doc)
+        if any(expected[key] != actual[key] for key in expected):
+            raise RuntimeError(f"analyze_doc disagrees with the legacy analysis on a {len(doc)}-word document.")
+
+        legacy = best_time(legacy_analysis, doc, repeat)
+        single_pass = best_time(analyze_doc, doc, repeat)
+        print(f"{len(doc):>8} {legacy * 1000:>10.2f} {single_pass * 1000:>15.2f} {legacy / single_pass:>7.1f}x")
+
+def main():
+    # Command line entry point for comparing the legacy and single-pass analyses.
+    parser = argparse.ArgumentParser(description="Time the word_count analysis on long documents.")
+    parser.add_argument('--model', default='en_core_web_sm', help="spaCy model used to parse the documents.")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 50000], help="Approximate document sizes in words.")
+    parser.add_argument('--repeat', type=int, default=5, help="Runs per measurement; the fastest is reported.")
+    args = parser.parse_args()
+
+    run_benchmark(spacy.load(args.model), args.sizes, args.repeat)
+
+if __name__ == "__main__":
+    main()
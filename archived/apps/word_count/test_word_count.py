@@ -0,0 +1,22 @@
+import io
+
+from word_count import iter_text_chunks, split_chunk
+
+def test_split_chunk_prefers_a_paragraph_break():
+    text = "First sentence. Second sentence.\n\nNext paragraph starts here."
+    assert split_chunk(text, 40) == ("First sentence. Second sentence.\n\n", "Next paragraph starts here.")
+
+def test_split_chunk_falls_back_to_the_last_sentence_end():
+    text = "One two. Three four. Five six seven"
+    assert split_chunk(text, 30) == ("One two. Three four. ", "Five six seven")
+
+def test_split_chunk_falls_back_to_whitespace_then_a_hard_cut():
+    assert split_chunk("alpha beta gamma", 12) == ("alpha beta ", "gamma")
+    assert split_chunk("abcdefghij", 4) == ("abcd", "efghij")
+
+def test_text_chunks_stay_under_the_limit_and_keep_every_character():
+    text = ''.join(f"Sentence number {index} is here. " + ("\n\n" if index % 7 == 0 else "") for index in range(500))
+    chunks = list(iter_text_chunks(io.StringIO(text), max_chars=300))
+
+    assert all(len(chunk) <= 300 for chunk in chunks)
+    assert ''.join(chunks) == text
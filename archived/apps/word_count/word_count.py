@@ -1,10 +1,43 @@
+import argparse
+from collections import Counter, OrderedDict
+from functools import lru_cache
+import hashlib
+import json
 import logging
-import spacy
-from spacy.errors import Errors
+import os
 import re
 
 logger = logging.getLogger(__name__)
 nlp = None
+MODEL_NAME = "en_core_web_sm"
+
+# Pipeline components each statistic needs. Components no requested statistic needs are disabled while parsing a corpus.
+STAT_COMPONENTS = {
+    'word_types': {'tok2vec', 'tagger', 'attribute_ruler'},
+    'dependencies': {'tok2vec', 'parser'},
+}
+
+# Coarse part-of-speech tags reported as word types; every other tag is reported as 'Other'.
+WORD_TYPES = ('NOUN', 'VERB', 'ADJ', 'ADV', 'ADP', 'CONJ', 'PRON', 'DET', 'SCONJ', 'INTJ', 'NUM', 'SYM', 'X')
+SPECIAL_PREPOSITIONS = frozenset({'about', 'above', 'across'})
+LONG_TEXT_WORDS = 20
+
+# Streaming mode parses large files in chunks of at most CHUNK_CHARS characters, well below spaCy's default max_length.
+# Chunks end at the last paragraph break before the limit, else at the last sentence end, else at the last whitespace.
+CHUNK_CHARS = 100000
+CHUNK_BREAKS = (re.compile(r'\n[ \t]*\n\s*'), re.compile(r'[.!?]["\')\]]*\s+'), re.compile(r'\s+'))
+
+# Count-only queries are answered with these patterns instead of a spaCy parse. A word is a run of letters or digits,
+# optionally joined by apostrophes or hyphens ("don't", "well-known"); every other non-space character is punctuation.
+VALID_INPUT = re.compile(r'^[a-zA-Z -]*$')
+WORD_PATTERN = re.compile(r"[^\W_]+(?:['’-][^\W_]+)*")
+CHARACTER_CLASSES = {
+    'letters': re.compile(r'[^\W\d_]'),
+    'digits': re.compile(r'\d'),
+    'whitespace': re.compile(r'\s'),
+    'punctuation': re.compile(r'[^\w\s]|_'),
+}
+CACHE_ENTRIES = 1024
 
 class SpacyModelError(Exception):
     pass
@@ -17,10 +50,12 @@ def initialize_logger():
     logging.basicConfig(filename='error.log', level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
 def load_spacy_model(model_name):
-    # Function to load a Spacy model based on the given model_name.
+    # Function to load a Spacy model based on the given model_name. spaCy itself is only imported here, so count-only queries never load it.
     global nlp
     if nlp is None:
         try:
+            import spacy
+
             nlp = spacy.load(model_name)
             logger.info(f"Spacy model loaded successfully: {model_name}")
         except OSError as error:
@@ -28,23 +63,19 @@ def load_spacy_model(model_name):
             raise SpacyModelError("Failed to load Spacy model")
     return nlp
 
-def validate_word(text, nlp):
-    # Validate the input text to ensure it is a valid English word.
+def validate_word(text):
+    # Validate the input text to ensure it is a valid English word. The pattern only admits letters, spaces and hyphens,
+    # so the text does not need to be parsed to check its tokens.
     try:
-        if not isinstance(text, str) or not text or not re.match("^[a-zA-Z -]*$", text):
+        if not isinstance(text, str) or not text or not VALID_INPUT.match(text):
             raise InputValidationError("Invalid input")
-        
-        doc = nlp(text)
-        return all(token.is_alpha or token.text in [' ', '-'] for token in doc)
-    except (InputValidationError, Exception) as error:
+        return True
+    except InputValidationError as error:
         logger.error(f"Invalid input: {error}")
         return False
 
 def get_user_input():
-    # Get user input and validate it using the Spacy model.
-    model_name = "en_core_web_sm"  # Load model only once
-    nlp = load_spacy_model(model_name)
-    
+    # Get user input and validate it.
     while True:
         text = input("Enter a word or sentence (or 'q' to quit): ").lower()
         if text == 'q':
@@ -56,53 +87,292 @@ def get_user_input():
             print("Empty input. Please enter a valid English word or sentence or 'q' to quit.")
             continue
 
-        if validate_word(text, nlp):
+        if validate_word(text):
             return text
         else:
             logger.warning(f"Invalid input: {text}. Please enter a valid English word or 'q' to quit.")
             print("Invalid input. Please enter a valid English word or sentence or 'q' to quit.")
 
+@lru_cache(maxsize=None)
+def word_type_table():
+    # Build the lookup table from part-of-speech IDs to word types once. Tokens carry their tag as an integer ID,
+    # so classifying a token is a dictionary lookup instead of a string comparison.
+    from spacy.parts_of_speech import IDS
+
+    return {int(pos_id): (name if name in WORD_TYPES else 'Other') for name, pos_id in IDS.items()}, int(IDS['ADP'])
+
 def word_type(token):
     # Determine the word type (Noun, Verb, Adjective, Preposition) for a given token.
-    word_types_mapping = {'NOUN', 'VERB', 'ADJ', 'ADV', 'ADP', 'CONJ', 'PRON', 'DET', 'SCONJ', 'INTJ', 'NUM', 'SYM', 'X'}
-    special_prepositions = {'about', 'above', 'across'}
-    
-    if token.pos_ == 'ADP' and token.text.lower() in special_prepositions:
+    table, adp = word_type_table()
+    if token.pos == adp and token.lower_ in SPECIAL_PREPOSITIONS:
         return 'Complex Preposition'
-    
-    return token.pos_ if token.pos_ in word_types_mapping else 'Other'
+    return table.get(token.pos, 'Other')
+
+def analyze_doc(doc):
+    # Count words, word types, dependency labels and sentence lengths in a single traversal of the document.
+    table, adp = word_type_table()
+    has_sentences = doc.has_annotation('SENT_START')
+    word_types = {}
+    dependency_ids = {}
+    sentence_lengths = []
+    sentence_length = 0
+
+    for token in doc:
+        if has_sentences and token.is_sent_start and sentence_length:
+            sentence_lengths.append(sentence_length)
+            sentence_length = 0
+        sentence_length += 1
+
+        pos = token.pos
+        wt = 'Complex Preposition' if pos == adp and token.lower_ in SPECIAL_PREPOSITIONS else table.get(pos, 'Other')
+        words = word_types.get(wt)
+        if words is None:
+            word_types[wt] = [token.text]
+        else:
+            words.append(token.text)
+
+        dep = token.dep
+        dependency_ids[dep] = dependency_ids.get(dep, 0) + 1
+
+    if sentence_length:
+        sentence_lengths.append(sentence_length)
+
+    strings = doc.vocab.strings
+    return {
+        'words': len(doc),
+        'word_types': word_types,
+        'dependencies': {strings[dep]: count for dep, count in dependency_ids.items()},
+        'sentences': len(sentence_lengths),
+        'longest_sentence': max(sentence_lengths, default=0),
+    }
+
+def readability_suggestions(analysis):
+    # Suggest readability improvements for an analyzed text.
+    return ["Consider breaking down the text into shorter sentences."] if analysis['words'] > LONG_TEXT_WORDS else []
+
+def quick_counts(text):
+    # Count words and character classes with the compiled patterns alone. No spaCy model is needed.
+    counts = {'words': sum(1 for _ in WORD_PATTERN.finditer(text)), 'characters': len(text)}
+    for name, pattern in CHARACTER_CLASSES.items():
+        counts[name] = len(pattern.findall(text))
+    return counts
+
+class AnalysisCache:
+    # Full analyses keyed by a hash of the model name and the text. The most recently used entries are kept in memory;
+    # with a directory, every analysis is also stored there as JSON, so it survives restarts.
+    def __init__(self, max_entries=CACHE_ENTRIES, directory=None):
+        self.max_entries = max_entries
+        self.directory = directory
+        self.entries = OrderedDict()
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    @staticmethod
+    def key(text, model_name=MODEL_NAME):
+        # Return the cache key of a text analyzed with the given model.
+        return hashlib.sha256(f"{model_name}\0{text}".encode('utf-8')).hexdigest()
+
+    def get(self, key):
+        # Return the cached analysis, or None. Disk hits are promoted into memory.
+        analysis = self.entries.get(key)
+        if analysis is not None:
+            self.entries.move_to_end(key)
+            return analysis
+        if self.directory:
+            try:
+                with open(os.path.join(self.directory, f"{key}.json"), 'r', encoding='utf-8') as file:
+                    analysis = json.load(file)
+            except (FileNotFoundError, json.JSONDecodeError):
+                return None
+            self.remember(key, analysis)
+        return analysis
+
+    def put(self, key, analysis):
+        # Store an analysis in memory and, atomically, on disk.
+        self.remember(key, analysis)
+        if self.directory:
+            path = os.path.join(self.directory, f"{key}.json")
+            with open(f"{path}.tmp", 'w', encoding='utf-8') as file:
+                json.dump(analysis, file)
+            os.replace(f"{path}.tmp", path)
 
-def process_text(input_text, nlp):
-    # Process the input text using the Spacy model and print relevant information.
+    def remember(self, key, analysis):
+        # Add an entry to the in-memory cache and evict the least recently used one when it is full.
+        self.entries[key] = analysis
+        self.entries.move_to_end(key)
+        if len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+analysis_cache = AnalysisCache()
+
+def analyze_text(text, nlp=None, count_only=False, cache=None):
+    # Tiered analysis of one text. Count-only queries use the regex fast path; full analyses are served from the cache
+    # and only parsed with spaCy (loaded on first use) when the text has not been seen before.
+    if count_only:
+        return quick_counts(text)
+
+    cache = analysis_cache if cache is None else cache
+    key = AnalysisCache.key(text)
+    analysis = cache.get(key)
+    if analysis is None:
+        analysis = analyze_doc((nlp or load_spacy_model(MODEL_NAME))(text))
+        cache.put(key, analysis)
+    return analysis
+
+def print_quick_counts(counts):
+    # Print the result of a count-only query.
+    print(f"Number of words: {counts['words']}")
+    print(f"Characters: {counts['characters']} ({', '.join(f'{name}: {counts[name]}' for name in CHARACTER_CLASSES)})")
+
+def process_text(input_text, nlp=None, count_only=False):
+    # Process the input text and print relevant information.
     try:
-        doc = nlp(input_text)
-        word_count = len(doc)
-        
-        word_types = {wt: [token.text for token in doc if word_type(token) == wt] for wt in set(word_type(token) for token in doc)}
-        
-        sentence_structure = {}
-        for sent in doc.sents:
-            for token in sent:
-                sentence_structure[token.dep_] = sentence_structure.get(token.dep_, 0) + 1
-                
-        readability_suggestions = ["Consider breaking down the text into shorter sentences."] if word_count > 20 else []
-
-        print(f"Number of words: {word_count}")
-        for wt, words in word_types.items():
+        analysis = analyze_text(input_text, nlp, count_only)
+        if count_only:
+            print_quick_counts(analysis)
+            return
+
+        print(f"Number of words: {analysis['words']}")
+        for wt, words in analysis['word_types'].items():
             print(f"{wt}s: {words}")
-        print(f"Sentence Structure: {sentence_structure}")
+        print(f"Sentence Structure: {analysis['dependencies']}")
+        print(f"Sentences: {analysis['sentences']} (longest: {analysis['longest_sentence']} words)")
         print("Readability Suggestions:")
-        for suggestion in readability_suggestions:
+        for suggestion in readability_suggestions(analysis):
             print(suggestion)
-    except (OSError, Errors) as error:
+    except (OSError, ValueError) as error:
         logger.error(f"An error occurred while processing text: {error}")
     except Exception as error:
         logger.error(f"An unexpected error occurred while processing text: {error}")
 
+def disabled_components(nlp, stats):
+    # Return the pipeline components that none of the requested statistics need.
+    required = set().union(*(STAT_COMPONENTS[stat] for stat in stats))
+    return [name for name in nlp.pipe_names if name not in required]
+
+def new_counts():
+    # Create empty corpus counts.
+    return {'documents': 0, 'words': 0, 'sentences': 0, 'longest_sentence': 0, 'word_types': Counter(), 'dependencies': Counter()}
+
+def count_doc(doc, stats, counts):
+    # Add the requested statistics of a parsed document to the corpus counts.
+    analysis = analyze_doc(doc)
+    counts['documents'] += 1
+    counts['words'] += analysis['words']
+    if doc.has_annotation('SENT_START'):
+        counts['sentences'] += analysis['sentences']
+        counts['longest_sentence'] = max(counts['longest_sentence'], analysis['longest_sentence'])
+    if 'word_types' in stats:
+        counts['word_types'].update({wt: len(words) for wt, words in analysis['word_types'].items()})
+    if 'dependencies' in stats:
+        counts['dependencies'].update(analysis['dependencies'])
+    return counts
+
+def read_documents(paths):
+    # Yield every non-empty line of the given text files as a document.
+    for path in paths:
+        with open(path, encoding='utf-8') as file:
+            for line in file:
+                line = line.strip()
+                if line:
+                    yield line
+
+def split_chunk(text, max_chars):
+    # Split text into a chunk of at most max_chars characters and the rest, at the best boundary before the limit.
+    for pattern in CHUNK_BREAKS:
+        cut = 0
+        for match in pattern.finditer(text, 1, max_chars):
+            cut = match.end()
+        if cut:
+            return text[:cut], text[cut:]
+    return text[:max_chars], text[max_chars:]
+
+def iter_text_chunks(file, max_chars=CHUNK_CHARS):
+    # Yield the text of an open file in chunks of at most max_chars characters, split at paragraph or sentence boundaries.
+    # At most two chunks' worth of text is held in memory, whatever the file size.
+    buffer = ''
+    while True:
+        block = file.read(max_chars)
+        buffer += block
+        while len(buffer) > max_chars or (buffer and not block):
+            chunk, buffer = split_chunk(buffer, max_chars) if len(buffer) > max_chars else (buffer, '')
+            if chunk.strip():
+                yield chunk
+        if not block:
+            return
+
+def iter_file_chunks(paths, max_chars=CHUNK_CHARS):
+    # Yield the chunks of every given text file in turn.
+    for path in paths:
+        with open(path, encoding='utf-8') as file:
+            yield from iter_text_chunks(file, max_chars)
+
+def process_corpus(documents, nlp, stats=tuple(STAT_COMPONENTS), batch_size=256, n_process=1):
+    # Stream documents through nlp.pipe in batches, optionally across n_process processes, and merge their counts.
+    disabled = disabled_components(nlp, stats)
+    logger.info(f"Processing corpus with batch_size={batch_size}, n_process={n_process}, disabled components: {disabled}")
+    counts = new_counts()
+    for doc in nlp.pipe(documents, batch_size=batch_size, n_process=n_process, disable=disabled):
+        count_doc(doc, stats, counts)
+    return counts
+
+def print_corpus_counts(counts):
+    # Print the merged counts of a corpus.
+    print(f"Number of documents: {counts['documents']}")
+    print(f"Number of words: {counts['words']}")
+    if counts['word_types']:
+        print(f"Word types: {dict(counts['word_types'].most_common())}")
+    if counts['dependencies']:
+        print(f"Sentence Structure: {dict(counts['dependencies'].most_common())}")
+    if counts['sentences']:
+        print(f"Sentences: {counts['sentences']} (longest: {counts['longest_sentence']} words)")
+
+def parse_args():
+    # Parse the command line. Without files the app runs interactively.
+    parser = argparse.ArgumentParser(description="Count words, word types and sentence structure.")
+    parser.add_argument('files', nargs='*', help="Text files to analyze as a corpus, one document per line.")
+    parser.add_argument('--count-only', action='store_true', help="Only count words and characters, without loading spaCy.")
+    parser.add_argument('--cache-dir', help="Directory where full analyses are cached across runs.")
+    parser.add_argument('--stream', action='store_true',
+                        help="Analyze each file as one text, parsed in chunks split at paragraph or sentence boundaries.")
+    parser.add_argument('--chunk-chars', type=int, default=CHUNK_CHARS, help="Maximum characters per chunk in streaming mode.")
+    parser.add_argument('--batch-size', type=int, default=256, help="Documents per nlp.pipe batch.")
+    parser.add_argument('--n-process', type=int, default=1, help="Processes used to parse the corpus (-1 for all cores).")
+    parser.add_argument('--stats', nargs='+', choices=list(STAT_COMPONENTS), default=list(STAT_COMPONENTS),
+                        help="Statistics to compute. Pipeline components only needed by other statistics are disabled.")
+    return parser.parse_args()
+
+def run_corpus(args):
+    # Analyze the files given on the command line as one corpus.
+    if args.count_only:
+        counts = Counter()
+        for document in (iter_file_chunks(args.files, args.chunk_chars) if args.stream else read_documents(args.files)):
+            counts.update(quick_counts(document))
+        print_quick_counts(counts)
+        return
+
+    nlp = load_spacy_model(MODEL_NAME)
+    if args.stream:
+        # Each chunk is a whole text of its own, so only a few are batched at a time to keep memory flat.
+        documents = iter_file_chunks(args.files, args.chunk_chars)
+        counts = process_corpus(documents, nlp, args.stats, min(args.batch_size, 4), args.n_process)
+        counts['documents'] = len(args.files)
+    else:
+        counts = process_corpus(read_documents(args.files), nlp, args.stats, args.batch_size, args.n_process)
+    print_corpus_counts(counts)
+
 def main():
     # The main function to run the Word Count App and handle user input.
     try:
         initialize_logger()
+        args = parse_args()
+        if args.cache_dir:
+            global analysis_cache
+            analysis_cache = AnalysisCache(directory=args.cache_dir)
+        if args.files:
+            run_corpus(args)
+            return
+
         print("Welcome to the Word Count App!")
 
         while True:
@@ -111,13 +381,10 @@ def main():
             if text == 'q':
                 break
 
-            model_name = "en_core_web_sm"  # You can change the model name here
-            nlp = load_spacy_model(model_name)
-            
-            process_text(text, nlp)
+            process_text(text, count_only=args.count_only)
             print()
 
-    except (OSError, Errors) as error:
+    except (OSError, ValueError) as error:
         logger.error(f"An error occurred in the main function: {error}", exc_info=True)
     except Exception as error:
         logger.error(f"An unexpected error occurred in the main function: {error}", exc_info=True)
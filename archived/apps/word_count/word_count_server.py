@@ -0,0 +1,251 @@
+import argparse
+from concurrent.futures import Future
+import http.client
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import json
+import logging
+import os
+import queue
+import socket
+import socketserver
+import threading
+import time
+
+from word_count import AnalysisCache, MODEL_NAME, SpacyModelError, analyze_doc, initialize_logger, load_spacy_model, quick_counts
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PORT = 8766
+BATCH_SIZE = 32  # Most texts parsed in one nlp.pipe call.
+MAX_WAIT_MS = 5  # How long the batcher waits for more requests after the first one arrives.
+REQUEST_TIMEOUT = 60
+LISTEN_BACKLOG = 128  # Pending connections accepted while all handler threads are busy.
+
+class AnalysisBatcher:
+    # Owns the spaCy pipeline. Requests from concurrent clients are queued, and a single thread parses them together
+    # in nlp.pipe batches of up to batch_size texts. Cached texts are answered without joining a batch.
+    def __init__(self, nlp, batch_size=BATCH_SIZE, max_wait_ms=MAX_WAIT_MS, cache=None):
+        self.nlp = nlp
+        self.batch_size = batch_size
+        self.max_wait = max_wait_ms / 1000
+        self.cache = cache or AnalysisCache()
+        self.requests = queue.Queue()
+        self.stats = {'requests': 0, 'cache_hits': 0, 'batches': 0, 'parsed': 0}
+        self.lock = threading.Lock()  # Guards the cache and the statistics, which handler threads share with the batcher.
+        self.thread = None
+
+    def submit(self, text):
+        # Return a future holding the full analysis of the text.
+        future = Future()
+        with self.lock:
+            self.stats['requests'] += 1
+            analysis = self.cache.get(AnalysisCache.key(text))
+            if analysis is not None:
+                self.stats['cache_hits'] += 1
+        if analysis is not None:
+            future.set_result(analysis)
+        else:
+            self.requests.put((text, future))
+        return future
+
+    def next_batch(self):
+        # Wait for the first request, then collect more until the batch is full or max_wait has passed.
+        batch = [self.requests.get()]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self.requests.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def run(self):
+        # Parse queued requests batch by batch. Identical texts in one batch are parsed once.
+        while True:
+            batch = self.next_batch()
+            waiting = {}
+            for text, future in batch:
+                waiting.setdefault(text, []).append(future)
+
+            try:
+                for text, doc in zip(waiting, self.nlp.pipe(waiting, batch_size=len(waiting))):
+                    analysis = analyze_doc(doc)
+                    with self.lock:
+                        self.cache.put(AnalysisCache.key(text), analysis)
+                    for future in waiting[text]:
+                        future.set_result(analysis)
+            except Exception as error:
+                logger.error(f"An error occurred while parsing a batch of {len(waiting)} text(s): {error}")
+                for futures in waiting.values():
+                    for future in futures:
+                        if not future.done():
+                            future.set_exception(error)
+
+            with self.lock:
+                self.stats['batches'] += 1
+                self.stats['parsed'] += len(waiting)
+
+    def start(self):
+        # Start the batcher thread.
+        self.thread = threading.Thread(target=self.run, name='analysis-batcher', daemon=True)
+        self.thread.start()
+        return self
+
+class AnalysisRequestHandler(BaseHTTPRequestHandler):
+    # POST /analyze with {"text": ...} or {"texts": [...]} and an optional "count_only" flag returns the analyses
+    # and the time spent serving the request. GET /health reports the model and batching statistics.
+    batcher = None
+
+    def do_GET(self):
+        # Report that the model is loaded, with the batcher statistics.
+        if self.path != '/health':
+            self.send_json({'error': f"Unknown endpoint: {self.path}"}, status=404)
+            return
+        with self.batcher.lock:
+            stats = dict(self.batcher.stats)
+        self.send_json({'model': MODEL_NAME, **stats})
+
+    def do_POST(self):
+        # Analyze the posted texts.
+        started = time.perf_counter()
+        if self.path != '/analyze':
+            self.send_json({'error': f"Unknown endpoint: {self.path}"}, status=404)
+            return
+
+        try:
+            request = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))) or b'{}')
+            if not isinstance(request, dict):
+                raise ValueError("Expected a JSON object.")
+            texts = request['texts'] if 'texts' in request else [request['text']]
+            if not isinstance(texts, list) or not all(isinstance(text, str) for text in texts):
+                raise ValueError("Texts must be a list of strings.")
+        except (KeyError, TypeError, ValueError) as error:
+            self.send_json({'error': f"Invalid request: {error}"}, status=400)
+            return
+
+        try:
+            if request.get('count_only'):
+                analyses = [quick_counts(text) for text in texts]
+            else:
+                futures = [self.batcher.submit(text) for text in texts]
+                analyses = [future.result(timeout=REQUEST_TIMEOUT) for future in futures]
+        except Exception as error:
+            self.send_json({'error': f"Analysis failed: {error}"}, status=500)
+            return
+
+        self.send_json({'analyses': analyses, 'elapsed_ms': round((time.perf_counter() - started) * 1000, 3)})
+
+    def send_json(self, payload, status=200):
+        # Write a JSON response.
+        body = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def address_string(self):
+        # Unix socket clients have no address.
+        return self.client_address[0] if isinstance(self.client_address, tuple) else 'unix'
+
+    def log_message(self, format, *args):
+        # Keep individual requests out of the application log.
+        pass
+
+class AnalysisHTTPServer(ThreadingHTTPServer):
+    # HTTP server with one thread per connection and room for bursts of concurrent clients.
+    daemon_threads = True
+    request_queue_size = LISTEN_BACKLOG
+
+class ThreadingUnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    # HTTP over a local Unix socket, for callers on the same machine.
+    daemon_threads = True
+    request_queue_size = LISTEN_BACKLOG
+
+class UnixHTTPConnection(http.client.HTTPConnection):
+    # HTTP client connection over a Unix socket.
+    def __init__(self, socket_path, timeout=REQUEST_TIMEOUT):
+        super().__init__('localhost', timeout=timeout)
+        self.socket_path = socket_path
+
+    def connect(self):
+        # Connect to the server's socket file instead of a TCP port.
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.settimeout(self.timeout)
+        self.sock.connect(self.socket_path)
+
+def create_server(batcher, host='127.0.0.1', port=DEFAULT_PORT, socket_path=None):
+    # Create the HTTP server, listening on a Unix socket when socket_path is given and on host:port otherwise.
+    handler = type('BoundAnalysisRequestHandler', (AnalysisRequestHandler,), {'batcher': batcher})
+    if socket_path:
+        if os.path.exists(socket_path):
+            os.remove(socket_path)
+        return ThreadingUnixHTTPServer(socket_path, handler)
+    return AnalysisHTTPServer((host, port), handler)
+
+def serve(nlp, host='127.0.0.1', port=DEFAULT_PORT, socket_path=None, batch_size=BATCH_SIZE, max_wait_ms=MAX_WAIT_MS, cache_dir=None):
+    # Serve analyses until interrupted. The model is loaded once by the caller and shared by every request.
+    batcher = AnalysisBatcher(nlp, batch_size, max_wait_ms, AnalysisCache(directory=cache_dir)).start()
+    server = create_server(batcher, host, port, socket_path)
+    print(f"Serving {MODEL_NAME} analyses on {socket_path or f'http://{host}:{port}'}.")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        if socket_path and os.path.exists(socket_path):
+            os.remove(socket_path)
+
+def analyze(texts, host='127.0.0.1', port=DEFAULT_PORT, socket_path=None, count_only=False, timeout=REQUEST_TIMEOUT):
+    # Client for scripted callers: send one text or a list of texts to a running server and return the decoded response,
+    # with the analyses under 'analyses' and the server time under 'elapsed_ms'.
+    connection = UnixHTTPConnection(socket_path, timeout) if socket_path else http.client.HTTPConnection(host, port, timeout=timeout)
+    body = json.dumps({'texts': [texts] if isinstance(texts, str) else list(texts), 'count_only': count_only})
+    try:
+        connection.request('POST', '/analyze', body, {'Content-Type': 'application/json'})
+        response = connection.getresponse()
+        payload = json.loads(response.read())
+    finally:
+        connection.close()
+    if response.status != 200:
+        raise RuntimeError(payload.get('error', f"Server returned {response.status}."))
+    return payload
+
+def main():
+    # Command line entry point to run the server or query it.
+    parser = argparse.ArgumentParser(description="Serve word_count analyses from a model loaded once.")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    serve_parser = subparsers.add_parser('serve', help="Load the model and serve analyses.")
+    serve_parser.add_argument('--host', default='127.0.0.1')
+    serve_parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    serve_parser.add_argument('--socket', help="Listen on this Unix socket instead of a TCP port.")
+    serve_parser.add_argument('--batch-size', type=int, default=BATCH_SIZE, help="Most texts parsed together.")
+    serve_parser.add_argument('--max-wait-ms', type=float, default=MAX_WAIT_MS, help="Time to wait for more requests to batch.")
+    serve_parser.add_argument('--cache-dir', help="Directory where analyses are cached across restarts.")
+
+    analyze_parser = subparsers.add_parser('analyze', help="Send texts to a running server.")
+    analyze_parser.add_argument('texts', nargs='+')
+    analyze_parser.add_argument('--host', default='127.0.0.1')
+    analyze_parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    analyze_parser.add_argument('--socket', help="Connect to this Unix socket instead of a TCP port.")
+    analyze_parser.add_argument('--count-only', action='store_true', help="Only count words and characters.")
+    args = parser.parse_args()
+
+    initialize_logger()
+    if args.command == 'serve':
+        try:
+            nlp = load_spacy_model(MODEL_NAME)
+        except SpacyModelError as error:
+            logger.error(f"Unable to start the server: {error}")
+            return
+        serve(nlp, args.host, args.port, args.socket, args.batch_size, args.max_wait_ms, args.cache_dir)
+    else:
+        print(json.dumps(analyze(args.texts, args.host, args.port, args.socket, args.count_only), indent=4))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,210 @@
+import hashlib
+import json
+import logging
+import os
+
+import pandas as pd
+
+CSV_FILE = 'music_sales.csv'
+VALUE_COLUMN = 'Value (Actual)'
+
+# Column types applied while parsing. 'Number of Records' is never read, and the repeated Format and Metric labels are stored as categories.
+CSV_COLUMNS = ['index', 'Format', 'Metric', 'Year', VALUE_COLUMN]
+CSV_DTYPES = {'Format': 'category', 'Metric': 'category', 'Year': 'int16', VALUE_COLUMN: 'float64'}
+CHUNK_ROWS = 100000  # Rows held in memory at a time by the streaming ingest.
+MAX_SCATTER_POINTS = 5000  # Points serialized per scatter plot; larger inputs are binned.
+WEBGL_THRESHOLD = 1000  # Above this many points, scatter plots use WebGL markers instead of SVG.
+
+def clean_sales(df: pd.DataFrame) -> pd.DataFrame:
+    # Replace missing values with 0 and clip negative values to 0 in one vectorized pass.
+    df[VALUE_COLUMN] = df[VALUE_COLUMN].fillna(0).clip(lower=0)
+    return df
+
+def read_sales_csv(csv_path: str = CSV_FILE) -> pd.DataFrame:
+    # Parse the sales CSV with compact column types and clean it.
+    df = pd.read_csv(csv_path, usecols=CSV_COLUMNS, dtype=CSV_DTYPES, index_col='index', engine='pyarrow')
+    return clean_sales(df)
+
+def iter_sales_chunks(csv_path: str = CSV_FILE, chunk_rows: int = CHUNK_ROWS):
+    # Yield the sales CSV as cleaned frames of at most chunk_rows rows, with the same columns, types and cleaning as read_sales_csv.
+    with pd.read_csv(csv_path, usecols=CSV_COLUMNS, dtype=CSV_DTYPES, index_col='index', chunksize=chunk_rows) as reader:
+        for chunk in reader:
+            yield clean_sales(chunk)
+
+def file_hash(path: str) -> str:
+    # Return the SHA-256 digest of a file, read in blocks.
+    digest = hashlib.sha256()
+    with open(path, 'rb') as file:
+        for block in iter(lambda: file.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+def cache_paths(csv_path: str) -> tuple:
+    # Return the Feather cache file and its metadata file stored next to the CSV.
+    base = os.path.splitext(csv_path)[0]
+    return f"{base}.feather", f"{base}.feather.json"
+
+def read_cache_meta(meta_path: str) -> dict:
+    # Read the fingerprint of the CSV the cache was built from. Returns an empty dictionary if there is none.
+    try:
+        with open(meta_path, 'r') as file:
+            return json.load(file)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+def write_cache(df: pd.DataFrame, cache_path: str, meta_path: str, meta: dict) -> None:
+    # Write the Feather cache and then its metadata. Both are replaced atomically, so readers never see a partial file.
+    df.reset_index().to_feather(f"{cache_path}.tmp", compression='uncompressed')
+    os.replace(f"{cache_path}.tmp", cache_path)
+    with open(f"{meta_path}.tmp", 'w') as file:
+        json.dump(meta, file)
+    os.replace(f"{meta_path}.tmp", meta_path)
+
+def cache_is_valid(csv_path: str, cache_path: str, meta_path: str) -> bool:
+    # Check whether the cache was built from the current CSV. An unchanged mtime and size are trusted;
+    # otherwise the CSV is hashed, so a touched but identical file keeps its cache.
+    meta = read_cache_meta(meta_path)
+    if not meta or not os.path.exists(cache_path):
+        return False
+    stat = os.stat(csv_path)
+    if meta.get('mtime_ns') == stat.st_mtime_ns and meta.get('size') == stat.st_size:
+        return True
+    if meta.get('sha256') != file_hash(csv_path):
+        return False
+
+    # Record the new mtime so the next load takes the fast path again.
+    meta.update(mtime_ns=stat.st_mtime_ns, size=stat.st_size)
+    with open(meta_path, 'w') as file:
+        json.dump(meta, file)
+    return True
+
+def load_sales(csv_path: str = CSV_FILE, refresh: bool = False) -> pd.DataFrame:
+    # Load the cleaned music sales data. The first load converts the CSV into a Feather cache next to it;
+    # later loads read the cache as long as the CSV is unchanged.
+    cache_path, meta_path = cache_paths(csv_path)
+    if not refresh and cache_is_valid(csv_path, cache_path, meta_path):
+        return pd.read_feather(cache_path).set_index('index')
+
+    stat = os.stat(csv_path)
+    df = read_sales_csv(csv_path)
+    write_cache(df, cache_path, meta_path, {'mtime_ns': stat.st_mtime_ns, 'size': stat.st_size, 'sha256': file_hash(csv_path)})
+    logging.info(f"Cached {len(df)} music sales rows from {csv_path} in {cache_path}.")
+    return df
+
+class SalesCube:
+    # Format × Metric × Year aggregate of the sales data with the summed value and row count per cell.
+    # The charts are drawn from the cube instead of the raw rows, and appended rows are folded in without re-reading the data.
+    KEYS = ['Format', 'Metric', 'Year']
+
+    def __init__(self) -> None:
+        # Create an empty cube.
+        self.cells = pd.DataFrame({VALUE_COLUMN: pd.Series(dtype='float64'), 'Rows': pd.Series(dtype='int64')},
+                                  index=pd.MultiIndex.from_tuples([], names=self.KEYS))
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame) -> 'SalesCube':
+        # Build a cube from cleaned sales rows.
+        cube = cls()
+        cube.update(df)
+        return cube
+
+    @staticmethod
+    def aggregate(df: pd.DataFrame) -> pd.DataFrame:
+        # Sum and count cleaned rows per Format, Metric and Year. Categories are turned into plain labels so cubes from different chunks align.
+        keys = [df[key].astype(str) if key != 'Year' else df[key].astype('int64') for key in SalesCube.KEYS]
+        return df.groupby(keys, sort=False)[VALUE_COLUMN].agg(['sum', 'size']).set_axis([VALUE_COLUMN, 'Rows'], axis=1)
+
+    def update(self, df: pd.DataFrame) -> 'SalesCube':
+        # Fold new cleaned rows into the cube. Only the new rows are aggregated.
+        self.merge(self.aggregate(df))
+        return self
+
+    def merge(self, cells: pd.DataFrame) -> 'SalesCube':
+        # Add aggregated cells, e.g. from another cube, into this cube.
+        merged = self.cells.add(cells, fill_value=0) if len(self.cells) else cells
+        self.cells = merged.astype({VALUE_COLUMN: 'float64', 'Rows': 'int64'}).sort_index()
+        return self
+
+    def frame(self, metrics: list = None, exclude: list = None) -> pd.DataFrame:
+        # Return the cells for the given metrics (or all metrics except the excluded ones) as a flat frame for plotting.
+        cells = self.cells.reset_index()
+        if metrics is not None:
+            cells = cells[cells['Metric'].isin(metrics)]
+        if exclude is not None:
+            cells = cells[~cells['Metric'].isin(exclude)]
+        return cells
+
+def histogram_figure(cube: SalesCube, metrics: list = None, exclude: list = None, **layout):
+    # Draw the per-year value of each format as stacked bars from the cube, matching the notebook's histograms.
+    # Rows with more than one metric get one facet row per metric.
+    import plotly.express as px
+    from plotly.colors import qualitative
+
+    data = cube.frame(metrics, exclude)
+    facet_row = 'Metric' if data['Metric'].nunique() > 1 else None
+    fig = px.bar(data_frame=data, x='Year', y=VALUE_COLUMN, color='Format', facet_row=facet_row,
+                 color_discrete_sequence=qualitative.Alphabet, labels={VALUE_COLUMN: f"sum of {VALUE_COLUMN}"}, **layout)
+    fig.update_layout(bargap=0)
+    return fig
+
+def downsample_points(data: pd.DataFrame, x: str, y: str, value: str, max_points: int) -> pd.DataFrame:
+    # Reduce a scatter to at most max_points rows. Numeric x values are first binned per y category, summing the value,
+    # then only the max_points largest bins are kept, since small markers are not visible next to the large ones.
+    if len(data) <= max_points:
+        return data
+
+    if pd.api.types.is_numeric_dtype(data[x]):
+        bins = max(1, max_points // max(1, data[y].nunique()))
+        binned = pd.cut(data[x], bins=bins)
+        data = (data.assign(**{x: binned}).groupby([x, y], observed=True, sort=False)[value].sum().reset_index())
+        data[x] = data[x].map(lambda interval: interval.mid).astype('float64')
+
+    return data.nlargest(max_points, value) if len(data) > max_points else data
+
+def scatter_plot(data: pd.DataFrame, x: str, y: str, value: str, x_range: tuple = None, max_points: int = MAX_SCATTER_POINTS,
+                 webgl_threshold: int = WEBGL_THRESHOLD, **layout):
+    # Draw a scatter sized and colored by value whose serialized size stays bounded as the data grows.
+    # Only rows inside x_range (the initial zoom) are sent, large inputs are binned and decimated to max_points,
+    # and WebGL markers are used above webgl_threshold points.
+    import plotly.express as px
+
+    data = data[[x, y, value]]
+    if x_range is not None:
+        data = data[data[x].between(*x_range)]
+    sampled = downsample_points(data, x, y, value, max_points)
+
+    fig = px.scatter(data_frame=sampled, x=x, y=y, size=value, color=value,
+                     render_mode='webgl' if len(sampled) > webgl_threshold else 'auto', **layout)
+    if x_range is not None:
+        fig.update_xaxes(range=list(x_range))
+    if len(sampled) < len(data):
+        fig.add_annotation(text=f"Showing {len(sampled)} of {len(data)} points (binned)", showarrow=False,
+                           xref='paper', yref='paper', x=1, y=1.05, xanchor='right')
+    return fig
+
+def scatter_figure(cube: SalesCube, metric: str, **options):
+    # Draw each format's yearly value for one metric, sized and colored by the value.
+    return scatter_plot(cube.frame([metric]), 'Year', 'Format', VALUE_COLUMN, **options)
+
+def ingest_csv(csv_path: str, chunk_rows: int = CHUNK_ROWS) -> SalesCube:
+    # Stream one CSV into a cube chunk by chunk. Memory use depends on chunk_rows and the number of cube cells, not on the file size.
+    cube = SalesCube()
+    for chunk in iter_sales_chunks(csv_path, chunk_rows):
+        cube.update(chunk)
+    logging.info(f"Ingested {int(cube.cells['Rows'].sum())} music sales rows from {csv_path}.")
+    return cube
+
+def ingest_files(csv_paths: list, chunk_rows: int = CHUNK_ROWS, processes: int = 1) -> SalesCube:
+    # Stream several CSVs into one cube. With more than one process, files are ingested in parallel and their cubes merged.
+    cube = SalesCube()
+    if processes > 1 and len(csv_paths) > 1:
+        from concurrent.futures import ProcessPoolExecutor
+        from functools import partial
+
+        with ProcessPoolExecutor(max_workers=min(processes, len(csv_paths))) as executor:
+            for file_cube in executor.map(partial(ingest_csv, chunk_rows=chunk_rows), csv_paths):
+                cube.merge(file_cube.cells)
+    else:
+        for csv_path in csv_paths:
+            cube.merge(ingest_csv(csv_path, chunk_rows).cells)
+    return cube
@@ -0,0 +1,30 @@
+import pandas as pd
+
+from music_sales import downsample_points
+
+def sales_points(rows: int) -> pd.DataFrame:
+    # Build a scatter input with two formats and one value per year.
+    return pd.DataFrame({
+        'Year': [1973 + index % 50 for index in range(rows)],
+        'Format': ['CD' if index % 2 else 'Vinyl' for index in range(rows)],
+        'Value': [float(index) for index in range(rows)],
+    })
+
+def test_small_inputs_are_returned_unchanged():
+    data = sales_points(10)
+    assert downsample_points(data, 'Year', 'Format', 'Value', max_points=10) is data
+
+def test_numeric_x_is_binned_per_category_and_the_value_summed():
+    data = sales_points(1000)
+    sampled = downsample_points(data, 'Year', 'Format', 'Value', max_points=100)
+
+    assert len(sampled) <= 100
+    assert sampled['Value'].sum() == data['Value'].sum()
+    assert set(sampled['Format']) == {'CD', 'Vinyl'}
+    assert sampled['Year'].dtype == 'float64'
+    assert sampled['Year'].between(data['Year'].min(), data['Year'].max()).all()
+
+def test_only_the_largest_points_are_kept_when_x_is_not_numeric():
+    data = pd.DataFrame({'Format': [f"Format {index}" for index in range(20)], 'Metric': 'Units', 'Value': [float(index) for index in range(20)]})
+    sampled = downsample_points(data, 'Format', 'Metric', 'Value', max_points=5)
+    assert sorted(sampled['Value']) == [15.0, 16.0, 17.0, 18.0, 19.0]
@@ -0,0 +1,148 @@
+import argparse
+import asyncio
+from datetime import date, datetime, timedelta
+import logging
+import re
+
+from weather_app import (AsyncWeatherDataFetcher, DatabaseHandler, LocationDeadline, LocationRegistry, ObservationSchema, ProgressStore,
+                         SchemaManager, WeatherDataFetcher, call_upstream_async, load_config)
+
+OWM_HISTORY_URL = 'https://history.openweathermap.org/data/2.5/history/city'
+WINDOW_DAYS = 7  # The history endpoint returns at most one week of hourly observations per request.
+CHECKPOINT_FILE = 'backfill_checkpoint.db'
+
+# Rows loaded by an earlier, interrupted attempt at the same window. Deleted in the COPY transaction so a retried window is not duplicated.
+DELETE_WINDOW_QUERY = '''
+DELETE FROM weather_data
+WHERE location = %s AND date BETWEEN %s AND %s
+AND climate_data->>'source' = 'backfill'
+AND (climate_data->>'reference_time')::bigint >= %s AND (climate_data->>'reference_time')::bigint < %s
+'''
+
+def history_windows(start: date, end: date, window_days: int = WINDOW_DAYS) -> list:
+    # Split the inclusive date range into (start, end) unix timestamp windows at local midnight.
+    windows = []
+    day = start
+    while day <= end:
+        window_end = min(day + timedelta(days=window_days), end + timedelta(days=1))
+        windows.append((int(datetime.combine(day, datetime.min.time()).timestamp()), int(datetime.combine(window_end, datetime.min.time()).timestamp())))
+        day = window_end
+    return windows
+
+def checkpoint_key(location: str, window_start: int) -> str:
+    # Build the checkpoint entry for one location window.
+    return f"{location}|{window_start}"
+
+def history_records(location: str, observations: list) -> list:
+    # Normalize one window of history entries in a single vectorized pass and build validated weather data records.
+    # Entries with missing or invalid values are logged and skipped.
+    kelvins = [entry.get('main', {}).get('temp') for entry in observations]
+    temperatures, humidities, wind_speeds, rejected = ObservationSchema.normalize_batch(
+        [None if kelvin is None else round(kelvin - 273.15, 2) for kelvin in kelvins],  # OWM reports Kelvin by default.
+        [entry.get('main', {}).get('humidity') for entry in observations],
+        [entry.get('wind', {}).get('speed') for entry in observations])
+
+    records = []
+    for index, entry in enumerate(observations):
+        if rejected[index]:
+            logging.warning(f"Skipping history entry with missing values for {location} at {entry.get('dt')}.")
+            continue
+        observed_at = datetime.fromtimestamp(entry['dt'])
+        record = {
+            'date': observed_at.strftime('%Y-%m-%d'),
+            'time': observed_at.strftime('%H:%M:%S'),
+            'location': location,
+            'weather_status': WeatherDataFetcher.normalize_text_to_lowercase((entry.get('weather') or [{}])[0].get('main', '')).strip(),
+            'temperature': float(temperatures[index]),
+            'wind_speed': float(wind_speeds[index]),
+            'humidity': int(humidities[index]),
+            'reference_time': entry['dt'],
+            'source': 'backfill',
+        }
+        problems = ObservationSchema.problems(record)
+        if problems:
+            logging.warning(f"Skipping invalid history entry for {location} at {entry['dt']}: {'; '.join(problems)}.")
+            continue
+        records.append(record)
+    return records
+
+async def fetch_window(fetcher: AsyncWeatherDataFetcher, history_url: str, location: str, start_ts: int, end_ts: int) -> tuple:
+    # Fetch the hourly history of one location window. Returns the normalized location name and its records.
+    LocationDeadline.start()
+    normalized_location = WeatherDataFetcher.normalize_text_to_lowercase(location.title()).strip()
+    coordinates = await fetcher.get_coordinates(re.sub(r'[^\w\s]', '', normalized_location))
+    if coordinates is None:
+        raise RuntimeError(f"Unable to fetch coordinates for {normalized_location}.")
+    latitude, longitude = coordinates
+
+    response = await call_upstream_async('owm', fetcher.get_json, history_url,
+                                         {'lat': latitude, 'lon': longitude, 'type': 'hour', 'start': start_ts, 'end': end_ts, 'appid': fetcher.api_key})
+    return normalized_location, history_records(normalized_location, response.get('list', []))
+
+def load_window(location: str, start_ts: int, end_ts: int, records: list) -> None:
+    # Replace the window's backfilled rows with the given records in a single COPY transaction.
+    first_day, last_day = datetime.fromtimestamp(start_ts).date(), datetime.fromtimestamp(end_ts).date()
+    with DatabaseHandler() as database_handler:
+        database_handler.copy_records(records, DELETE_WINDOW_QUERY, (location, first_day, last_day, start_ts, end_ts))
+
+async def run_backfill(api_config, locations: list, start: date, end: date, checkpoint: ProgressStore, concurrency: int = 8,
+                       window_days: int = WINDOW_DAYS) -> dict:
+    # Backfill every location window not yet in the checkpoint, with at most concurrency windows in flight. Returns run totals.
+    history_url = f"{api_config.owm_proxy.rstrip('/')}/data/2.5/history/city" if api_config.owm_proxy else OWM_HISTORY_URL
+    completed = checkpoint.completed_locations()
+    windows = [(location, start_ts, end_ts) for location in locations for start_ts, end_ts in history_windows(start, end, window_days)
+               if checkpoint_key(location, start_ts) not in completed]
+    if completed:
+        logging.info(f"Resuming backfill: {len(completed)} window(s) already loaded, {len(windows)} remaining.")
+
+    pending = iter(windows)
+    totals = {'windows': 0, 'rows': 0, 'failed': 0}
+
+    async def backfill_worker(fetcher: AsyncWeatherDataFetcher) -> None:
+        # Fetch and load windows until none are left. A failed window stays out of the checkpoint and is retried by the next run.
+        for location, start_ts, end_ts in pending:
+            try:
+                normalized_location, records = await fetch_window(fetcher, history_url, location, start_ts, end_ts)
+                await asyncio.to_thread(load_window, normalized_location, start_ts, end_ts, records)
+                checkpoint.mark_completed([checkpoint_key(location, start_ts)])
+                totals['windows'] += 1
+                totals['rows'] += len(records)
+            except Exception as error:
+                totals['failed'] += 1
+                logging.error(f"Error backfilling {location} from {datetime.fromtimestamp(start_ts).date()}: {error}")
+
+    async with AsyncWeatherDataFetcher(api_config, concurrency) as fetcher:
+        await asyncio.gather(*(backfill_worker(fetcher) for _ in range(max(1, min(concurrency, len(windows))))))
+
+    logging.info(f"Backfill completed: {totals['windows']} window(s) and {totals['rows']} row(s) loaded, {totals['failed']} window(s) failed.")
+    return totals
+
+def main():
+    # Command line entry point for loading historical observations.
+    config = load_config()
+    parser = argparse.ArgumentParser(description="Backfill weather_data with hourly history from OpenWeatherMap.")
+    parser.add_argument('--start', type=date.fromisoformat, required=True, help="First day to load (YYYY-MM-DD).")
+    parser.add_argument('--end', type=date.fromisoformat, required=True, help="Last day to load (YYYY-MM-DD).")
+    parser.add_argument('--locations', default=config.location_file, help="Location file to backfill.")
+    parser.add_argument('--concurrency', type=int, default=8, help="History requests kept in flight.")
+    parser.add_argument('--window-days', type=int, default=WINDOW_DAYS, help="Days requested per history call.")
+    parser.add_argument('--checkpoint', default=CHECKPOINT_FILE, help="SQLite file recording loaded windows.")
+    parser.add_argument('--restart', action='store_true', help="Forget the checkpoint and load every window again.")
+    args = parser.parse_args()
+
+    if args.end < args.start:
+        parser.error("--end must not be before --start.")
+
+    checkpoint = ProgressStore(args.checkpoint)
+    if args.restart:
+        checkpoint.reset()
+
+    try:
+        SchemaManager.migrate()
+        asyncio.run(run_backfill(config.api_config(), LocationRegistry.from_file(args.locations).locations, args.start, args.end,
+                                 checkpoint, args.concurrency, args.window_days))
+    except (RuntimeError, ValueError) as error:
+        logging.error(f"Error occurred during backfill: {error}")
+
+if __name__ == "__main__":
+    main()
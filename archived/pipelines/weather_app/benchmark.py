@@ -0,0 +1,104 @@
+import argparse
+import itertools
+import logging
+import os
+import tempfile
+import time
+from urllib.parse import urlsplit, parse_qs
+
+from weather_app import (APIConfig, DatabaseCredentials, DatabaseHandler, DatabasePool, ObservationTracker, ProgressStore,
+                         SchemaManager, StageMetrics, collect_weather_data)
+from replay import ReplayServer, load_fixtures
+
+def start_local_database(data_dir: str):
+    # Start an embedded Postgres server in data_dir and point the pool at it. Requires the pgserver package.
+    try:
+        import pgserver
+    except ImportError:
+        raise RuntimeError("The benchmark needs the pgserver package for its local Postgres stand-in (pip install pgserver).")
+
+    server = pgserver.get_server(data_dir, cleanup_mode='stop')
+    uri = urlsplit(server.get_uri())
+    host = parse_qs(uri.query).get('host', [uri.hostname or 'localhost'])[0]
+    DatabasePool.configure(DatabaseCredentials(host, uri.path.lstrip('/') or 'postgres', uri.username or 'postgres', uri.password or ''))
+    return server
+
+def count_rows() -> int:
+    # Count the rows in the weather_data table.
+    with DatabaseHandler() as database_handler:
+        with database_handler.create_cursor(database_handler.conn) as cursor:
+            cursor.execute('SELECT count(*) FROM weather_data')
+            return cursor.fetchone()[0]
+
+def run_level(api_config: APIConfig, locations: list, concurrency: int, work_dir: str) -> dict:
+    # Run one collection cycle at the given concurrency and return throughput and per-stage latency.
+    # collect_weather_data creates a new fetcher, so every level starts with cold geocode caches.
+    StageMetrics.reset()
+    DatabasePool.reset_stats()
+    progress_store = ProgressStore(os.path.join(work_dir, f"progress_{concurrency}.db"))
+
+    rows_before = count_rows()
+    started = time.perf_counter()
+    collect_weather_data(api_config, locations, progress_store, chunk_size=concurrency)
+    elapsed = time.perf_counter() - started
+    rows_written = count_rows() - rows_before
+
+    return {
+        'concurrency': concurrency,
+        'elapsed_s': elapsed,
+        'locations_per_s': len(locations) / elapsed,
+        'db_rows_per_s': rows_written / elapsed,
+        'rows_written': rows_written,
+        'stages': StageMetrics.summary(),
+        'pool': DatabasePool.stats(),
+    }
+
+def print_report(results: list) -> None:
+    # Print the benchmark results as a table.
+    print(f"{'concurrency':>11} {'locations/s':>12} {'db rows/s':>10} {'elapsed s':>10} {'pool wait ms':>13} {'pool util':>10}")
+    for result in results:
+        print(f"{result['concurrency']:>11} {result['locations_per_s']:>12.1f} {result['db_rows_per_s']:>10.1f} {result['elapsed_s']:>10.2f} "
+              f"{result['pool']['mean_wait_ms']:>13.2f} {result['pool']['utilization']:>10.1%}")
+    print()
+    for result in results:
+        print(f"Per-stage latency at concurrency {result['concurrency']}:")
+        for stage, stats in sorted(result['stages'].items()):
+            print(f"  {stage:<10} n={stats['count']:<6} mean={stats['mean_ms']:.1f}ms p50={stats['p50_ms']:.1f}ms p95={stats['p95_ms']:.1f}ms max={stats['max_ms']:.1f}ms")
+
+def main():
+    # Command line entry point for the end-to-end throughput benchmark.
+    parser = argparse.ArgumentParser(description="Benchmark weather_app against replayed upstreams and a local Postgres stand-in.")
+    parser.add_argument('--fixtures', default='replay_fixtures.json', help="Fixture file written by 'replay.py record'.")
+    parser.add_argument('--locations', type=int, default=100, help="Number of locations per cycle (recorded locations are repeated).")
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 4, 16])
+    parser.add_argument('--latency-ms', type=float, default=50.0, help="Simulated upstream latency per request.")
+    args = parser.parse_args()
+
+    fixtures = load_fixtures(args.fixtures)
+    ObservationTracker.enabled = False  # Replayed observations never change, so change detection would skip every write.
+    locations = list(itertools.islice(itertools.cycle(fixtures['locations']), args.locations))
+    fixture_dir = os.path.dirname(os.path.abspath(args.fixtures))
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        # Run inside a scratch directory so the JSON silo and state files of the real app are untouched.
+        os.chdir(work_dir)
+        with open('weather_data.json', 'w') as file:
+            file.write('[]')
+
+        server = start_local_database(os.path.join(work_dir, 'pgdata'))
+        try:
+            SchemaManager.migrate()
+
+            with ReplayServer(fixtures, args.latency_ms) as replay_server:
+                api_config = APIConfig('replay', 'config.ini', replay_server.nominatim_url, replay_server.owm_proxy)
+                results = [run_level(api_config, locations, concurrency, work_dir) for concurrency in args.concurrency]
+        finally:
+            DatabasePool.cleanup()
+            os.chdir(fixture_dir)
+            server.cleanup()
+
+    logging.info(f"Benchmark completed for {len(locations)} location(s) per level.")
+    print_report(results)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,19 @@
+from urllib.parse import urlsplit, parse_qs
+
+import pytest
+
+from weather_app import DatabaseCredentials, DatabasePool, SchemaManager
+
+@pytest.fixture(scope='session')
+def database(tmp_path_factory):
+    # Start an embedded Postgres server for the test session, point the pool at it and bring its schema up to date.
+    # Tests that use it are skipped when the pgserver package is not installed.
+    pgserver = pytest.importorskip('pgserver')
+    server = pgserver.get_server(str(tmp_path_factory.mktemp('pg')), cleanup_mode='stop')
+    uri = urlsplit(server.get_uri())
+    host = parse_qs(uri.query).get('host', [uri.hostname or 'localhost'])[0]
+    DatabasePool.configure(DatabaseCredentials(host, uri.path.lstrip('/') or 'postgres', uri.username or 'postgres', uri.password or ''))
+    SchemaManager.migrate()
+    yield server
+    DatabasePool.close_all_connections()
+    server.cleanup()
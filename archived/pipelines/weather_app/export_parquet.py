@@ -0,0 +1,167 @@
+import argparse
+import json
+import logging
+import os
+import shutil
+import time
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+from psycopg2 import OperationalError, DatabaseError
+
+from weather_app import DatabaseHandler
+
+WATERMARK_FILE = 'export_watermark.json'
+GAP_RETENTION_SECONDS = 86400  # How long an id skipped by an export is looked for again before it is assumed rolled back or deleted.
+
+# Location and weather status repeat heavily, so they are dictionary-encoded in memory and in the Parquet files.
+EXPORT_SCHEMA = pa.schema([
+    ('id', pa.int64()),
+    ('date', pa.date32()),
+    ('time', pa.time64('us')),
+    ('location', pa.dictionary(pa.int32(), pa.string())),
+    ('weather_status', pa.dictionary(pa.int32(), pa.string())),
+    ('temperature', pa.float64()),
+    ('wind_speed', pa.float64()),
+    ('humidity', pa.int16()),
+])
+
+# Ids are allocated when a row is inserted, not when its transaction commits, so a concurrent writer or a long COPY can commit
+# rows below ids that were already exported. Ids skipped below the watermark are kept as gaps and read again by the next export.
+EXPORT_QUERY = '''
+SELECT id, date, time, location, weather_status, temperature::float8, wind_speed::float8, humidity
+FROM weather_data
+WHERE id > %(last_id)s
+UNION ALL
+SELECT w.id, w.date, w.time, w.location, w.weather_status, w.temperature::float8, w.wind_speed::float8, w.humidity
+FROM weather_data w
+JOIN unnest(%(gap_starts)s::int[], %(gap_ends)s::int[]) AS gap(first_id, last_id) ON w.id BETWEEN gap.first_id AND gap.last_id
+ORDER BY id
+'''
+
+def read_watermark(watermark_file: str = WATERMARK_FILE) -> tuple:
+    # Read the id of the last exported row and the gaps below it as [first id, last id, first seen] ranges.
+    # Returns (0, []) if nothing has been exported yet.
+    try:
+        with open(watermark_file, 'r') as file:
+            watermark = json.load(file)
+        return int(watermark['last_id']), [[int(first), int(last), float(seen)] for first, last, seen in watermark.get('gaps', [])]
+    except FileNotFoundError:
+        return 0, []
+    except (KeyError, TypeError, ValueError, json.JSONDecodeError) as watermark_error:
+        error_message = f"Invalid export watermark file {watermark_file}: {watermark_error}"
+        logging.error(error_message)
+        raise RuntimeError(error_message)
+
+def write_watermark(last_id: int, gaps: list, watermark_file: str = WATERMARK_FILE) -> None:
+    # Persist the id of the last exported row and the gaps still to be looked for.
+    with open(watermark_file, 'w') as file:
+        json.dump({'last_id': last_id, 'gaps': gaps}, file)
+
+def expire_gaps(gaps: list, now: float, retention: float = GAP_RETENTION_SECONDS) -> list:
+    # Drop gaps older than the retention. Their ids belonged to rolled back inserts or to rows deleted before they were exported.
+    kept = [gap for gap in gaps if now - gap[2] < retention]
+    if len(kept) < len(gaps):
+        logging.info(f"Stopped looking for {len(gaps) - len(kept)} export gap(s) older than {retention} seconds.")
+    return kept
+
+def advance_watermark(last_id: int, gaps: list, ids: list, now: float) -> tuple:
+    # Account for a batch of exported ids in ascending order. Ids inside a gap split it; ids above the watermark
+    # move it up, and the ids they skipped become a new gap. Returns the new (last_id, gaps).
+    remaining = []
+    gap_ids = iter(sorted(row_id for row_id in ids if row_id <= last_id))
+    row_id = next(gap_ids, None)
+    for first, last, seen in gaps:
+        while row_id is not None and row_id <= last:
+            if row_id >= first:
+                if row_id > first:
+                    remaining.append([first, row_id - 1, seen])
+                first = row_id + 1
+            row_id = next(gap_ids, None)
+        if first <= last:
+            remaining.append([first, last, seen])
+
+    for row_id in ids:
+        if row_id > last_id:
+            if row_id > last_id + 1:
+                remaining.append([last_id + 1, row_id - 1, now])
+            last_id = row_id
+    return last_id, remaining
+
+def replace_dataset(staging_dir: str, output_dir: str) -> None:
+    # Put a completely written dataset in place of the previous one. The old files are only deleted once the new ones are in place.
+    previous_dir = f"{output_dir}.previous"
+    shutil.rmtree(previous_dir, ignore_errors=True)
+    if os.path.exists(output_dir):
+        os.replace(output_dir, previous_dir)
+    os.replace(staging_dir, output_dir)
+    shutil.rmtree(previous_dir, ignore_errors=True)
+
+def rows_to_table(rows: list) -> pa.Table:
+    # Convert a batch of weather_data rows into an Arrow table using the export schema.
+    columns = list(zip(*rows))
+    return pa.table([pa.array(column, type=field.type) for column, field in zip(columns, EXPORT_SCHEMA)], schema=EXPORT_SCHEMA)
+
+def export_weather_data(output_dir: str, incremental: bool = True, batch_size: int = 50000, partition_cols=('date',)) -> int:
+    # Stream weather_data rows through a server-side cursor into Parquet files partitioned by date. Returns the number of exported rows.
+    # Location stays a dictionary-encoded column; rows are sorted by location, so each location is a contiguous run in a file.
+    # A full export is written to a staging directory that replaces output_dir at the end, so files of earlier exports are not kept.
+    last_id, gaps = read_watermark() if incremental else (0, [])
+    gaps = expire_gaps(gaps, time.time())
+    exported_rows = 0
+    dataset_dir = output_dir if incremental else f"{output_dir}.full"
+    if not incremental:
+        shutil.rmtree(dataset_dir, ignore_errors=True)  # Left behind by an interrupted full export.
+        os.makedirs(dataset_dir)
+
+    try:
+        with DatabaseHandler() as database_handler:
+            # A named cursor keeps the result set on the server and fetches it in batches.
+            with database_handler.conn.cursor(name='weather_data_export') as cursor:
+                cursor.itersize = batch_size
+                cursor.execute(EXPORT_QUERY, {'last_id': last_id, 'gap_starts': [gap[0] for gap in gaps], 'gap_ends': [gap[1] for gap in gaps]})
+
+                while True:
+                    rows = cursor.fetchmany(batch_size)
+                    if not rows:
+                        break
+
+                    table = rows_to_table(sorted(rows, key=lambda row: (row[3] or '', row[0])))
+                    pq.write_to_dataset(table, root_path=dataset_dir, partition_cols=list(partition_cols),
+                                        basename_template=f"part-{rows[0][0]}-{{i}}.parquet", compression='zstd')
+
+                    # Advance the watermark after every batch so an interrupted incremental export resumes where it stopped.
+                    last_id, gaps = advance_watermark(last_id, gaps, [row[0] for row in rows], time.time())
+                    if incremental:
+                        write_watermark(last_id, gaps)
+                    exported_rows += len(rows)
+                    logging.info(f"Exported {exported_rows} weather data rows to {output_dir} (last id: {last_id}).")
+
+            database_handler.conn.rollback()  # Close the read-only transaction that held the server-side cursor.
+
+    except (OperationalError, DatabaseError) as db_error:
+        error_message = f"Database error occurred during Parquet export: {db_error}"
+        logging.error(error_message)
+        raise RuntimeError(error_message)
+
+    if not incremental:
+        replace_dataset(dataset_dir, output_dir)
+        write_watermark(last_id, gaps)
+    logging.info(f"Parquet export completed. {exported_rows} rows exported.")
+    return exported_rows
+
+def main():
+    # Command line entry point for exporting the weather history to Parquet.
+    parser = argparse.ArgumentParser(description="Export weather_data from Postgres to partitioned Parquet files.")
+    parser.add_argument('--output-dir', default='weather_history', help="Root directory of the Parquet dataset.")
+    parser.add_argument('--full', action='store_true', help="Export every row instead of only rows added since the last watermark.")
+    parser.add_argument('--batch-size', type=int, default=50000, help="Rows fetched from the server-side cursor per batch.")
+    args = parser.parse_args()
+
+    try:
+        export_weather_data(args.output_dir, incremental=not args.full, batch_size=args.batch_size)
+    except RuntimeError as runtime_error:
+        logging.error(f"Runtime Error occurred during Parquet export: {runtime_error}")
+
+if __name__ == "__main__":
+    main()
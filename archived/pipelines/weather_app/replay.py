@@ -0,0 +1,168 @@
+import argparse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import json
+import logging
+import re
+import threading
+import time
+from urllib.parse import urlsplit, parse_qs
+
+from weather_app import LocationRegistry, load_config
+
+OWM_WEATHER_URL = 'https://api.openweathermap.org/data/2.5/weather'
+
+def geocode_query(location: str) -> str:
+    # Build the Nominatim query the app sends for a location (lowercased, punctuation removed).
+    return re.sub(r'[^\w\s]', '', location.lower())
+
+def coordinates_key(latitude, longitude) -> str:
+    # Build the fixture key for a pair of coordinates rounded the way the app rounds them.
+    return f"{round(float(latitude), 4):.4f},{round(float(longitude), 4):.4f}"
+
+def record_fixtures(api_key: str, locations: list, fixture_file: str) -> dict:
+    # Capture real Nominatim and OpenWeatherMap responses for the given locations into a fixture file.
+    import geocoder
+    import requests
+
+    fixtures = {'locations': [], 'nominatim': {}, 'owm': {}}
+
+    for location in locations:
+        query = geocode_query(location)
+        geo_location = geocoder.osm(query)
+        if geo_location.latlng is None:
+            logging.warning(f"No geocoding result recorded for location: {location}")
+            continue
+
+        latitude, longitude = (round(value, 4) for value in geo_location.latlng)
+        response = requests.get(OWM_WEATHER_URL, params={'lat': latitude, 'lon': longitude, 'appid': api_key}, timeout=10)
+        response.raise_for_status()
+
+        fixtures['locations'].append(location)
+        fixtures['nominatim'][query] = geo_location.raw
+        fixtures['owm'][coordinates_key(latitude, longitude)] = response.json()
+        logging.info(f"Recorded fixtures for location: {location}")
+
+    with open(fixture_file, 'w') as file:
+        json.dump(fixtures, file, indent=4)
+    logging.info(f"Recorded {len(fixtures['locations'])} location(s) to {fixture_file}.")
+    return fixtures
+
+def load_fixtures(fixture_file: str) -> dict:
+    # Load a fixture file written by record_fixtures.
+    with open(fixture_file, 'r') as file:
+        return json.load(file)
+
+class ReplayRequestHandler(BaseHTTPRequestHandler):
+    # Serves recorded Nominatim searches and OWM current weather and hourly history responses after a simulated latency.
+    # OWM requests arrive in proxy form (absolute URL), so only the path and query string are used for routing.
+    fixtures = {'nominatim': {}, 'owm': {}}
+    latency = 0.0
+
+    def do_GET(self):
+        # Route a GET request to the matching fixture.
+        time.sleep(self.latency)
+        url = urlsplit(self.path)
+        params = {key: values[0] for key, values in parse_qs(url.query).items()}
+
+        if url.path.endswith('/search'):
+            raw = self.fixtures['nominatim'].get(params.get('q', ''))
+            self.send_json([raw] if raw else [])
+        elif url.path.endswith('/data/2.5/history/city'):
+            response = self.fixtures['owm'].get(coordinates_key(params.get('lat', 0), params.get('lon', 0)))
+            if response is None:
+                self.send_json({'cod': '404', 'message': 'city not found'}, status=404)
+            else:
+                self.send_json(self.history_response(response, int(params.get('start', 0)), int(params.get('end', 0))))
+        elif url.path.endswith('/data/2.5/weather'):
+            response = self.fixtures['owm'].get(coordinates_key(params.get('lat', 0), params.get('lon', 0)))
+            if response is None:
+                self.send_json({'cod': '404', 'message': 'city not found'}, status=404)
+            else:
+                self.send_json(response)
+        else:
+            self.send_json({'message': f"Unknown replay endpoint: {url.path}"}, status=404)
+
+    @staticmethod
+    def history_response(observation: dict, start: int, end: int) -> dict:
+        # Stand in for the OWM hourly history endpoint by repeating a recorded observation once per hour of the range.
+        entries = [{'dt': timestamp, 'main': observation['main'], 'wind': observation['wind'], 'weather': observation['weather']}
+                   for timestamp in range(start - start % 3600, end, 3600)]
+        return {'message': f"Count: {len(entries)}", 'cod': '200', 'city_id': observation.get('id', 0), 'cnt': len(entries), 'list': entries}
+
+    def send_json(self, payload, status: int = 200) -> None:
+        # Write a JSON response.
+        body = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        # Keep replayed requests out of the application log.
+        pass
+
+class ReplayServer:
+    # Local stand-in for Nominatim and OpenWeatherMap that replays recorded fixtures.
+    def __init__(self, fixtures: dict, latency_ms: float = 0.0, host: str = '127.0.0.1', port: int = 0) -> None:
+        # Create the server. Port 0 picks a free port.
+        handler = type('BoundReplayRequestHandler', (ReplayRequestHandler,), {'fixtures': fixtures, 'latency': latency_ms / 1000})
+        self.server = ThreadingHTTPServer((host, port), handler)
+        self.server.daemon_threads = True
+        self.thread = None
+
+    @property
+    def base_url(self) -> str:
+        # Return the root URL of the server.
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def nominatim_url(self) -> str:
+        # Return the URL to pass to geocoder.osm.
+        return f"{self.base_url}/search"
+
+    @property
+    def owm_proxy(self) -> str:
+        # Return the proxy URL that routes OWM requests to this server.
+        return self.base_url
+
+    def __enter__(self):
+        # Start serving in a background thread.
+        self.thread = threading.Thread(target=self.server.serve_forever, name='replay-server', daemon=True)
+        self.thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        # Stop the server.
+        self.server.shutdown()
+        self.server.server_close()
+
+def main():
+    # Command line entry point to record fixtures or serve them.
+    parser = argparse.ArgumentParser(description="Record and replay upstream responses for weather_app.")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    record_parser = subparsers.add_parser('record', help="Record live Nominatim and OWM responses.")
+    record_parser.add_argument('--fixtures', default='replay_fixtures.json')
+    record_parser.add_argument('--locations', default='locations.txt', help="Location file to record.")
+
+    serve_parser = subparsers.add_parser('serve', help="Serve recorded responses.")
+    serve_parser.add_argument('--fixtures', default='replay_fixtures.json')
+    serve_parser.add_argument('--latency-ms', type=float, default=0.0)
+    serve_parser.add_argument('--port', type=int, default=8765)
+    args = parser.parse_args()
+
+    if args.command == 'record':
+        api_key = load_config().api_key
+        record_fixtures(api_key, LocationRegistry.from_file(args.locations).locations, args.fixtures)
+    else:
+        with ReplayServer(load_fixtures(args.fixtures), args.latency_ms, port=args.port) as replay_server:
+            print(f"Replaying fixtures. Set nominatim_url = {replay_server.nominatim_url} and owm_proxy = {replay_server.owm_proxy} in the [Endpoints] section of config.ini.")
+            try:
+                replay_server.thread.join()
+            except KeyboardInterrupt:
+                pass
+
+if __name__ == "__main__":
+    main()
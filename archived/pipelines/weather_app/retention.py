@@ -0,0 +1,167 @@
+import argparse
+from datetime import date, timedelta
+import json
+import logging
+
+from psycopg2 import OperationalError, DatabaseError
+
+from weather_app import DatabaseHandler, JSONHandler, SchemaManager, load_config
+
+JSON_FILE = 'weather_data.json'
+
+# Merge newly compacted aggregates into an existing bucket, so late rows for an already compacted period are folded in.
+# Samples per weather status are added up, and the dominant status is recomputed from the merged counts.
+MERGE_AGGREGATES = '''
+ON CONFLICT ({key}) DO UPDATE SET
+    sample_count = target.sample_count + EXCLUDED.sample_count,
+    temperature_min = LEAST(target.temperature_min, EXCLUDED.temperature_min),
+    temperature_max = GREATEST(target.temperature_max, EXCLUDED.temperature_max),
+    temperature_sum = target.temperature_sum + EXCLUDED.temperature_sum,
+    status_counts = merge_status_counts(target.status_counts, EXCLUDED.status_counts),
+    dominant_status = dominant_status(merge_status_counts(target.status_counts, EXCLUDED.status_counts)),
+    dominant_status_count = dominant_status_count(merge_status_counts(target.status_counts, EXCLUDED.status_counts))
+RETURNING 1
+'''
+
+# Move one day of raw rows into hourly aggregates: the DELETE and the INSERT commit together, so no row is lost or counted twice.
+COMPACT_RAW_DAY = '''
+WITH expired AS (
+    DELETE FROM weather_data WHERE date = %(day)s
+    RETURNING location, date + coalesce(time, '00:00'::time) AS observed_at, weather_status, temperature
+), by_status AS (
+    SELECT location, date_trunc('hour', observed_at) AS bucket, weather_status, count(*) AS status_count
+    FROM expired WHERE weather_status IS NOT NULL GROUP BY 1, 2, 3
+), statuses AS (
+    SELECT location, bucket, jsonb_object_agg(weather_status, status_count) AS status_counts
+    FROM by_status GROUP BY 1, 2
+), buckets AS (
+    SELECT location, date_trunc('hour', observed_at) AS bucket, count(*) AS sample_count,
+           min(temperature) AS temperature_min, max(temperature) AS temperature_max, coalesce(sum(temperature), 0) AS temperature_sum
+    FROM expired GROUP BY 1, 2
+), inserted AS (
+    INSERT INTO weather_data_hourly AS target
+        (location, bucket, sample_count, temperature_min, temperature_max, temperature_sum, status_counts, dominant_status, dominant_status_count)
+    SELECT b.location, b.bucket, b.sample_count, b.temperature_min, b.temperature_max, b.temperature_sum, coalesce(s.status_counts, '{}'),
+           dominant_status(s.status_counts), dominant_status_count(s.status_counts)
+    FROM buckets b LEFT JOIN statuses s USING (location, bucket)
+''' + MERGE_AGGREGATES.format(key='location, bucket') + '''
+)
+SELECT (SELECT count(*) FROM expired), (SELECT count(*) FROM inserted);
+'''
+
+# Move one day of hourly aggregates into a daily aggregate. The per-status counts of the hours are added up.
+COMPACT_HOURLY_DAY = '''
+WITH expired AS (
+    DELETE FROM weather_data_hourly WHERE bucket >= %(day)s AND bucket < %(day)s + interval '1 day'
+    RETURNING location, bucket::date AS date, sample_count, temperature_min, temperature_max, temperature_sum, status_counts
+), by_status AS (
+    SELECT location, date, key AS weather_status, sum(value::integer) AS status_count
+    FROM expired, jsonb_each_text(expired.status_counts) GROUP BY 1, 2, 3
+), statuses AS (
+    SELECT location, date, jsonb_object_agg(weather_status, status_count) AS status_counts
+    FROM by_status GROUP BY 1, 2
+), days AS (
+    SELECT location, date, sum(sample_count) AS sample_count,
+           min(temperature_min) AS temperature_min, max(temperature_max) AS temperature_max, sum(temperature_sum) AS temperature_sum
+    FROM expired GROUP BY 1, 2
+), inserted AS (
+    INSERT INTO weather_data_daily AS target
+        (location, date, sample_count, temperature_min, temperature_max, temperature_sum, status_counts, dominant_status, dominant_status_count)
+    SELECT d.location, d.date, d.sample_count, d.temperature_min, d.temperature_max, d.temperature_sum, coalesce(s.status_counts, '{}'),
+           dominant_status(s.status_counts), dominant_status_count(s.status_counts)
+    FROM days d LEFT JOIN statuses s USING (location, date)
+''' + MERGE_AGGREGATES.format(key='location, date') + '''
+)
+SELECT (SELECT count(*) FROM expired), (SELECT count(*) FROM inserted);
+'''
+
+# The oldest day still held in each tier. Both queries are answered from the date and bucket indexes.
+OLDEST_RAW_DAY = 'SELECT min(date) FROM weather_data WHERE date < %s'
+OLDEST_HOURLY_DAY = 'SELECT min(bucket)::date FROM weather_data_hourly WHERE bucket < %s'
+
+def compact_tier(database_handler: DatabaseHandler, oldest_query: str, compact_query: str, cutoff: date) -> tuple:
+    # Compact every day older than the cutoff, oldest first, one transaction per day. Returns (rows removed, aggregate rows written).
+    # Compacted rows are deleted, so each pass starts at the first day that expired since the previous pass.
+    removed_rows, aggregate_rows = 0, 0
+    conn = database_handler.conn
+    with database_handler.create_cursor(conn) as cursor:
+        while True:
+            cursor.execute(oldest_query, (cutoff,))
+            day = cursor.fetchone()[0]
+            if day is None:
+                break
+            cursor.execute(compact_query, {'day': day})
+            removed, written = cursor.fetchone()
+            conn.commit()
+            removed_rows += removed
+            aggregate_rows += written
+            logging.info(f"Compacted {removed} row(s) from {day} into {written} aggregate row(s).")
+    return removed_rows, aggregate_rows
+
+def prune_json_silo(cutoff: date, json_file: str = JSON_FILE) -> int:
+    # Drop JSON records dated before the cutoff in one rewrite. Records are appended in arrival order,
+    # so only the expired prefix is removed and the file is left untouched when nothing has expired. Returns the number of dropped records.
+    cutoff_text = cutoff.isoformat()
+    json_handler = JSONHandler()
+    with json_handler.process_lock():
+        with json_handler.open_json_file(json_file, 'r') as file:
+            records = json.load(file)
+
+        expired = 0
+        while expired < len(records) and records[expired].get('date', '') < cutoff_text:
+            expired += 1
+        if not expired:
+            return 0
+
+        with json_handler.open_json_file(json_file, 'w') as file:
+            json.dump(records[expired:], file, indent=4)
+    logging.info(f"Dropped {expired} expired record(s) from {json_file}.")
+    return expired
+
+def apply_retention(raw_days: int, hourly_days: int, today: date = None) -> dict:
+    # Compact raw rows older than raw_days into hourly aggregates and hourly aggregates older than hourly_days into daily aggregates.
+    # Daily aggregates are kept indefinitely. Returns the number of rows affected per tier.
+    if hourly_days < raw_days:
+        raise ValueError("hourly_days must not be shorter than raw_days.")
+
+    today = today or date.today()
+    raw_cutoff = today - timedelta(days=raw_days)
+    hourly_cutoff = today - timedelta(days=hourly_days)
+
+    try:
+        SchemaManager.migrate()
+        with DatabaseHandler() as database_handler:
+            raw_removed, hourly_written = compact_tier(database_handler, OLDEST_RAW_DAY, COMPACT_RAW_DAY, raw_cutoff)
+            hourly_removed, daily_written = compact_tier(database_handler, OLDEST_HOURLY_DAY, COMPACT_HOURLY_DAY, hourly_cutoff)
+
+    except (OperationalError, DatabaseError) as db_error:
+        error_message = f"Database error occurred while applying retention: {db_error}"
+        logging.error(error_message)
+        raise RuntimeError(error_message)
+
+    json_removed = prune_json_silo(raw_cutoff)
+    summary = {
+        'raw_rows_compacted': raw_removed,
+        'hourly_rows_written': hourly_written,
+        'hourly_rows_compacted': hourly_removed,
+        'daily_rows_written': daily_written,
+        'json_records_dropped': json_removed,
+    }
+    logging.info(f"Retention pass completed: {summary}")
+    return summary
+
+def main():
+    # Command line entry point for one retention pass. Defaults come from the [Retention] section of config.ini.
+    retention_config = load_config().values.get('Retention', {})
+    parser = argparse.ArgumentParser(description="Compact expired weather_data rows into hourly and daily aggregates.")
+    parser.add_argument('--raw-days', type=int, default=int(retention_config.get('raw_days', 30)), help="Days raw observations are kept.")
+    parser.add_argument('--hourly-days', type=int, default=int(retention_config.get('hourly_days', 365)), help="Days hourly aggregates are kept.")
+    args = parser.parse_args()
+
+    try:
+        apply_retention(args.raw_days, args.hourly_days)
+    except (RuntimeError, ValueError) as error:
+        logging.error(f"Error occurred during retention pass: {error}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,43 @@
+import argparse
+import subprocess
+import sys
+
+def measure_imports(module: str) -> list:
+    # Import the module in a fresh interpreter with -X importtime and return (cumulative_us, self_us, name) per imported module.
+    completed = subprocess.run([sys.executable, '-X', 'importtime', '-c', f"import {module}"], capture_output=True, text=True)
+    if completed.returncode != 0:
+        raise RuntimeError(f"Importing {module} failed:\n{completed.stderr.strip().splitlines()[-1]}")
+
+    timings = []
+    for line in completed.stderr.splitlines():
+        # Lines look like: "import time:       123 |       4567 |   package.module"
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        timings.append((int(cumulative_us), int(self_us), name.rstrip()))
+    return timings
+
+def print_report(module: str, timings: list, top: int) -> None:
+    # Print the total import time of the module and its slowest direct imports.
+    # -X importtime indents nested imports by two spaces per level, so direct imports of the module have exactly one level.
+    total_us = next((cumulative_us for cumulative_us, _, name in timings if name.strip() == module), 0)
+    direct_imports = [timing for timing in timings if timing[2].startswith('  ') and not timing[2].startswith('    ')]
+    print(f"Importing {module} took {total_us / 1000:.1f} ms across {len(timings)} modules.")
+    print(f"{'cumulative ms':>14} {'self ms':>9}  module")
+    for cumulative_us, self_us, name in sorted(direct_imports, reverse=True)[:top]:
+        print(f"{cumulative_us / 1000:>14.1f} {self_us / 1000:>9.1f}  {name.strip()}")
+
+def main():
+    # Command line entry point for the import-time report.
+    parser = argparse.ArgumentParser(description="Report where startup time goes when importing weather_app.")
+    parser.add_argument('--module', default='weather_app')
+    parser.add_argument('--top', type=int, default=15)
+    args = parser.parse_args()
+
+    try:
+        print_report(args.module, measure_imports(args.module), args.top)
+    except RuntimeError as runtime_error:
+        print(runtime_error)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+from datetime import date
+
+import pytest
+
+import retention
+from weather_app import DatabaseHandler
+
+CUTOFF = date(2024, 2, 1)
+
+@pytest.fixture
+def database_handler(database):
+    # Hand out a connection to empty weather tables.
+    with DatabaseHandler() as database_handler:
+        with database_handler.create_cursor(database_handler.conn) as cursor:
+            cursor.execute('TRUNCATE weather_data, weather_data_hourly, weather_data_daily')
+        database_handler.conn.commit()
+        yield database_handler
+
+def observation(day: str, observed_time: str, weather_status: str, temperature: float = 20.0) -> dict:
+    # Build a weather_data record for location 'a'.
+    return {'date': day, 'time': observed_time, 'location': 'a', 'weather_status': weather_status,
+            'temperature': temperature, 'wind_speed': 1.0, 'humidity': 50}
+
+def compact_raw(database_handler: DatabaseHandler) -> None:
+    # Compact every raw row older than the cutoff into hourly aggregates.
+    retention.compact_tier(database_handler, retention.OLDEST_RAW_DAY, retention.COMPACT_RAW_DAY, CUTOFF)
+
+def fetch_one(database_handler: DatabaseHandler, query: str) -> tuple:
+    # Run a query and return its first row.
+    with database_handler.create_cursor(database_handler.conn) as cursor:
+        cursor.execute(query)
+        return cursor.fetchone()
+
+HOURLY_QUERY = "SELECT sample_count, status_counts, dominant_status, dominant_status_count FROM weather_data_hourly"
+
+def test_late_rows_change_the_dominant_status(database_handler):
+    database_handler.copy_records([observation('2024-01-01', '01:10:00', 'rain'), observation('2024-01-01', '01:20:00', 'rain'),
+                                   observation('2024-01-01', '01:30:00', 'clouds')])
+    compact_raw(database_handler)
+    assert fetch_one(database_handler, HOURLY_QUERY) == (3, {'rain': 2, 'clouds': 1}, 'rain', 2)
+
+    database_handler.copy_records([observation('2024-01-01', '01:40:00', 'clouds'), observation('2024-01-01', '01:50:00', 'clouds')])
+    compact_raw(database_handler)
+    assert fetch_one(database_handler, HOURLY_QUERY) == (5, {'rain': 2, 'clouds': 3}, 'clouds', 3)
+
+def test_late_rows_with_the_same_status_add_up(database_handler):
+    database_handler.copy_records([observation('2024-01-01', '01:10:00', 'rain'), observation('2024-01-01', '01:20:00', 'rain')])
+    compact_raw(database_handler)
+    database_handler.copy_records([observation('2024-01-01', '01:40:00', 'rain'), observation('2024-01-01', '01:50:00', 'rain')])
+    compact_raw(database_handler)
+    assert fetch_one(database_handler, HOURLY_QUERY) == (4, {'rain': 4}, 'rain', 4)
+
+def test_daily_aggregate_adds_up_hourly_status_counts(database_handler):
+    # Rain dominates each hour it appears in, but clouds has more samples over the day.
+    database_handler.copy_records([observation('2024-01-01', '01:10:00', 'rain', 10.0), observation('2024-01-01', '01:20:00', 'rain', 12.0),
+                                   observation('2024-01-01', '01:30:00', 'clouds', 14.0),
+                                   observation('2024-01-01', '02:10:00', 'clouds', 16.0), observation('2024-01-01', '02:20:00', 'clouds', 18.0)])
+    compact_raw(database_handler)
+    retention.compact_tier(database_handler, retention.OLDEST_HOURLY_DAY, retention.COMPACT_HOURLY_DAY, CUTOFF)
+
+    sample_count, status_counts, dominant_status, dominant_status_count, temperature_min, temperature_max = fetch_one(
+        database_handler, "SELECT sample_count, status_counts, dominant_status, dominant_status_count, temperature_min, temperature_max FROM weather_data_daily")
+    assert (sample_count, status_counts, dominant_status, dominant_status_count) == (5, {'rain': 2, 'clouds': 3}, 'clouds', 3)
+    assert (float(temperature_min), float(temperature_max)) == (10.0, 18.0)
+    assert fetch_one(database_handler, "SELECT count(*) FROM weather_data_hourly") == (0,)
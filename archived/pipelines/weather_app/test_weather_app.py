@@ -0,0 +1,124 @@
+import csv
+import json
+
+import pytest
+
+from weather_app import CircuitBreaker, CircuitOpenError, LocationRegistry, ObservationSpool, RetryBudget
+
+class RecordingConnection:
+    # Stands in for a psycopg2 connection and keeps the locations of the rows loaded with COPY, in load order.
+    def __init__(self) -> None:
+        self.locations = []
+
+    def cursor(self):
+        # The connection is its own cursor.
+        return self
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        return False
+
+    def copy_expert(self, query: str, stream) -> None:
+        # Read back the CSV rows written by DatabaseHandler.copy_records; location is the third column.
+        self.locations.extend(row[2] for row in csv.reader(stream))
+
+    def commit(self) -> None:
+        pass
+
+def spool_lines(*locations: str) -> str:
+    # Serialize one spooled observation per location, as ObservationSpool.append writes them.
+    return ''.join(json.dumps({'date': '2024-01-01', 'time': '10:00:00', 'location': location, 'weather_status': 'rain',
+                               'temperature': 20.0, 'wind_speed': 1.0, 'humidity': 50}) + '\n' for location in locations)
+
+@pytest.fixture
+def spool(tmp_path):
+    # A spool in an empty directory.
+    return ObservationSpool(str(tmp_path / 'weather_spool.jsonl'))
+
+def test_spool_replays_an_interrupted_replay_before_the_current_spool(spool):
+    with open(spool.replay_file, 'w') as file:
+        file.write(spool_lines('a', 'b'))
+    spool.append(spool_lines('c', 'd').splitlines())
+    conn = RecordingConnection()
+
+    assert spool.replay(conn) == 4
+    assert conn.locations == ['a', 'b', 'c', 'd']
+    assert not spool.has_pending()
+
+def test_spool_replay_skips_a_torn_last_line(spool):
+    with open(spool.spool_file, 'w') as file:
+        file.write(spool_lines('a') + '{"date": "2024-01')
+    conn = RecordingConnection()
+
+    assert spool.replay(conn) == 1
+    assert conn.locations == ['a']
+    assert spool.replay(conn) == 0
+
+def test_retry_budget_allows_a_share_of_the_calls(monkeypatch):
+    monkeypatch.setattr(RetryBudget, '_calls', {})
+    monkeypatch.setattr(RetryBudget, '_retries', {})
+    monkeypatch.setattr(RetryBudget, 'MIN_RETRIES', 1)
+    monkeypatch.setattr(RetryBudget, 'RATIO', 0.5)
+
+    assert RetryBudget.try_spend('owm')
+    assert not RetryBudget.try_spend('owm')
+    for _ in range(4):
+        RetryBudget.record_call('owm')
+    assert RetryBudget.try_spend('owm') and RetryBudget.try_spend('owm')
+    assert not RetryBudget.try_spend('owm')
+    assert RetryBudget.try_spend('nominatim')  # Each upstream has its own budget.
+    assert RetryBudget.summary()['owm'] == {'calls': 4, 'retries': 3}
+
+def test_circuit_breaker_opens_after_consecutive_failures():
+    breaker = CircuitBreaker('test')
+    for _ in range(CircuitBreaker.FAILURE_THRESHOLD - 1):
+        breaker.record_failure()
+    breaker.before_call()
+    breaker.record_success()  # A success resets the count.
+    for _ in range(CircuitBreaker.FAILURE_THRESHOLD - 1):
+        breaker.record_failure()
+    breaker.before_call()
+
+    breaker.record_failure()
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+
+def test_circuit_breaker_lets_one_trial_call_through_after_the_timeout():
+    breaker = CircuitBreaker('test')
+    breaker.RESET_TIMEOUT = 0.0
+    for _ in range(CircuitBreaker.FAILURE_THRESHOLD):
+        breaker.record_failure()
+
+    breaker.before_call()
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()  # Only one trial at a time.
+    breaker.record_failure()  # A failed trial re-opens the circuit.
+    breaker.before_call()
+    breaker.record_success()
+    breaker.before_call()
+    breaker.before_call()
+
+def test_circuit_breaker_is_shared_per_upstream():
+    assert CircuitBreaker.for_upstream('nominatim') is CircuitBreaker.for_upstream('nominatim')
+    assert CircuitBreaker.for_upstream('nominatim') is not CircuitBreaker.for_upstream('owm')
+
+def test_location_registry_cleans_and_sorts_locations():
+    registry = LocationRegistry([' Magalang, PH', 'Angeles, PH', '', 'Magalang, PH\n', '   '])
+    assert registry.locations == ['Angeles, PH', 'Magalang, PH']
+
+def test_location_registry_reads_files_without_comments(tmp_path):
+    location_file = tmp_path / 'locations.txt'
+    location_file.write_text('# Philippines\nAngeles, PH\n\n  # Central Luzon\nMagalang, PH\n', encoding='utf-8')
+    assert LocationRegistry.from_file(str(location_file)).locations == ['Angeles, PH', 'Magalang, PH']
+    assert LocationRegistry.from_file(str(tmp_path / 'missing.txt')).locations == sorted(LocationRegistry.DEFAULT_LOCATIONS)
+
+def test_location_registry_shards_partition_the_locations():
+    registry = LocationRegistry([f"Location {index}" for index in range(200)])
+    shards = [registry.shard(shard_index, 4) for shard_index in range(4)]
+
+    assert sorted(location for shard in shards for location in shard) == registry.locations
+    assert all(shards)
+    # Shards depend only on the location name, so they are the same in every process and after restarts.
+    assert LocationRegistry.shard_of('Angeles, PH', 4) == LocationRegistry.shard_of('Angeles, PH', 4) == 2838421829 % 4
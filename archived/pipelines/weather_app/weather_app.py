@@ -1,25 +1,46 @@
+from array import array
 import configparser
+import contextvars
+import csv
+from dataclasses import dataclass
 from datetime import datetime
-from functools import lru_cache, partial
+from functools import lru_cache
+import glob
+import hashlib
+import io
 import json
 import logging
+import os
 from typing import Union, Tuple, Any
-
-from dask import delayed, compute
-from psycopg2 import OperationalError, DatabaseError, pool, sql
-from pyowm import OWM
-import geocoder
+from types import MappingProxyType
+
+# Heavy optional subsystems (dask, pyowm, geocoder, geopy and psutil) are imported where they are first used,
+# so short runs and helper scripts do not pay for them at startup. See startup_report.py.
+import psycopg2
+from psycopg2 import OperationalError, DatabaseError, pool
+from psycopg2.errors import UndefinedTable
+from psycopg2.extensions import TRANSACTION_STATUS_IDLE, TRANSACTION_STATUS_UNKNOWN
+from psycopg2.extras import execute_batch
 from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
 from cachetools import TTLCache, LRUCache
-from geopy.exc import GeocoderTimedOut, GeocoderServiceError
-from tenacity import retry, stop_after_attempt, wait_exponential
-from queue import LifoQueue
+from tenacity import AsyncRetrying, Retrying, retry_if_not_exception_type, wait_exponential
+from queue import Queue, Empty, Full
+from collections import deque
 import time
 import threading
 import re
+import sys
 import traceback
 import atexit
-import psutil
+import multiprocessing
+import sqlite3
+import zlib
+
+try:
+    import fcntl  # Used to serialize JSON file and spool updates across processes (not available on Windows).
+except ImportError:
+    fcntl = None
 
 logging.basicConfig(level=logging.DEBUG,
                     format='%(asctime)s - %(levelname)s - %(message)s',
@@ -34,8 +55,8 @@ weather_data_collection_completed = False
 
 class APIConfig:
     # Model for storing API related configuration data.
-    def __init__(self, api_key: str, config_file: str):
-        # Initialize APIConfig with API key and configuration file.
+    def __init__(self, api_key: str, config_file: str, nominatim_url: str = None, owm_proxy: str = None):
+        # Initialize APIConfig with API key and configuration file. The optional endpoints redirect upstream calls, e.g. to replay servers.
         if not api_key or api_key.isspace():
             error_message = "API key cannot be empty or whitespace only."
             logging.error(error_message)
@@ -43,6 +64,8 @@ class APIConfig:
         
         self.api_key = api_key
         self.config_file = config_file
+        self.nominatim_url = nominatim_url
+        self.owm_proxy = owm_proxy
 
 class ErrorResult:
     # Model for error results with error code, message, and details.
@@ -70,6 +93,8 @@ class ErrorCode:
 
 class LocationData:
     # Data class for storing location information.
+    __slots__ = ('location_name', 'latitude', 'longitude', 'additional_info')
+
     def __init__(self, location_name: str, latitude: float, longitude: float, additional_info: dict):
         # Initialize LocationData object with provided data.
         self.location_name = location_name
@@ -102,55 +127,399 @@ class LocationData:
         if not isinstance(self.location_name, str) or not isinstance(self.latitude, (int, float)) or not isinstance(self.longitude, (int, float)) or not isinstance(self.additional_info, dict):
             raise ValueError("Invalid data in LocationData object. Please provide valid data for insertion.")
 
+class StageMetrics:
+    # Thread-safe latency samples per pipeline stage (geocode, weather, db_write, json_write).
+    SAMPLE_SIZE = 10000  # Keep only the most recent samples per stage so long runs use bounded memory.
+    _samples = {}
+    _counts = {}
+    _mutex = threading.Lock()
+
+    @staticmethod
+    @contextmanager
+    def track(stage: str):
+        # Measure the wall time of the enclosed block and record it under the given stage.
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - started
+            with StageMetrics._mutex:
+                StageMetrics._samples.setdefault(stage, deque(maxlen=StageMetrics.SAMPLE_SIZE)).append(elapsed)
+                StageMetrics._counts[stage] = StageMetrics._counts.get(stage, 0) + 1
+
+    @staticmethod
+    def summary() -> dict:
+        # Return count, mean, p50, p95 and max latency in milliseconds per stage.
+        with StageMetrics._mutex:
+            samples = {stage: sorted(values) for stage, values in StageMetrics._samples.items()}
+            counts = dict(StageMetrics._counts)
+        return {
+            stage: {
+                'count': counts[stage],
+                'mean_ms': 1000 * sum(values) / len(values),
+                'p50_ms': 1000 * values[len(values) // 2],
+                'p95_ms': 1000 * values[min(len(values) - 1, int(len(values) * 0.95))],
+                'max_ms': 1000 * values[-1],
+            }
+            for stage, values in samples.items() if values
+        }
+
+    @staticmethod
+    def reset() -> None:
+        # Drop all recorded samples.
+        with StageMetrics._mutex:
+            StageMetrics._samples.clear()
+            StageMetrics._counts.clear()
+
+class CircuitOpenError(RuntimeError):
+    # Raised instead of calling an upstream whose circuit breaker is open.
+    pass
+
+class CircuitBreaker:
+    # Per-upstream circuit breaker. Opens after consecutive failures and lets a single trial call through after the reset timeout.
+    FAILURE_THRESHOLD = 5  # Consecutive failures before the circuit opens.
+    RESET_TIMEOUT = 30.0  # Seconds the circuit stays open before a trial call is allowed.
+    _breakers = {}
+    _mutex = threading.Lock()
+
+    def __init__(self, upstream: str) -> None:
+        # Initialize a closed circuit for the upstream.
+        self.upstream = upstream
+        self.consecutive_failures = 0
+        self.opened_at = None
+        self.trial_in_progress = False
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def for_upstream(upstream: str) -> 'CircuitBreaker':
+        # Return the shared breaker for an upstream, creating it on first use.
+        with CircuitBreaker._mutex:
+            if upstream not in CircuitBreaker._breakers:
+                CircuitBreaker._breakers[upstream] = CircuitBreaker(upstream)
+            return CircuitBreaker._breakers[upstream]
+
+    def before_call(self) -> None:
+        # Fail fast while the circuit is open. After the reset timeout, one caller is let through as a trial.
+        with self.lock:
+            if self.opened_at is None:
+                return
+            if self.trial_in_progress or time.monotonic() - self.opened_at < self.RESET_TIMEOUT:
+                raise CircuitOpenError(f"Circuit open for {self.upstream}; skipping call.")
+            self.trial_in_progress = True
+
+    def record_success(self) -> None:
+        # Close the circuit after a successful call.
+        with self.lock:
+            if self.opened_at is not None:
+                logging.info(f"Circuit closed for {self.upstream}.")
+            self.consecutive_failures = 0
+            self.opened_at = None
+            self.trial_in_progress = False
+
+    def record_failure(self) -> None:
+        # Count a failed call and open (or re-open) the circuit when the threshold is reached.
+        with self.lock:
+            self.consecutive_failures += 1
+            self.trial_in_progress = False
+            if self.opened_at is not None or self.consecutive_failures >= self.FAILURE_THRESHOLD:
+                if self.opened_at is None:
+                    logging.warning(f"Circuit opened for {self.upstream} after {self.consecutive_failures} consecutive failures.")
+                self.opened_at = time.monotonic()
+
+class RetryBudget:
+    # Per-run, per-upstream retry budget. Retries may not exceed RATIO of the calls made so far, plus MIN_RETRIES.
+    RATIO = 0.2
+    MIN_RETRIES = 10
+    _calls = {}
+    _retries = {}
+    _mutex = threading.Lock()
+
+    @staticmethod
+    def record_call(upstream: str) -> None:
+        # Count a first attempt to an upstream.
+        with RetryBudget._mutex:
+            RetryBudget._calls[upstream] = RetryBudget._calls.get(upstream, 0) + 1
+
+    @staticmethod
+    def try_spend(upstream: str) -> bool:
+        # Take one retry from the upstream's budget. Returns False if the budget is exhausted.
+        with RetryBudget._mutex:
+            retries = RetryBudget._retries.get(upstream, 0)
+            if retries >= RetryBudget.MIN_RETRIES + RetryBudget.RATIO * RetryBudget._calls.get(upstream, 0):
+                return False
+            RetryBudget._retries[upstream] = retries + 1
+            return True
+
+    @staticmethod
+    def summary() -> dict:
+        # Return calls and retries per upstream.
+        with RetryBudget._mutex:
+            return {upstream: {'calls': calls, 'retries': RetryBudget._retries.get(upstream, 0)} for upstream, calls in RetryBudget._calls.items()}
+
+class LocationDeadline:
+    # Deadline for processing the current location, shared by all upstream calls made for it.
+    # A context variable keeps it separate per thread and per asyncio task.
+    SECONDS = 30.0  # Overall time allowed per location, including retries.
+    _expires_at = contextvars.ContextVar('location_deadline', default=None)
+
+    @staticmethod
+    def start(seconds: float = None) -> None:
+        # Start the deadline for the location processed by the current thread or task.
+        LocationDeadline._expires_at.set(time.monotonic() + (seconds or LocationDeadline.SECONDS))
+
+    @staticmethod
+    def remaining() -> float:
+        # Return the seconds left before the deadline, or infinity if no deadline was started.
+        expires_at = LocationDeadline._expires_at.get()
+        return float('inf') if expires_at is None else expires_at - time.monotonic()
+
+UPSTREAM_MAX_ATTEMPTS = 3
+UPSTREAM_WAIT = wait_exponential(multiplier=1, min=4, max=10)
+
+def stop_upstream_retries(upstream: str):
+    # Build a tenacity stop condition: attempts exhausted, no time left before the deadline, or no retry budget left.
+    def stop(retry_state) -> bool:
+        if retry_state.attempt_number >= UPSTREAM_MAX_ATTEMPTS:
+            return True
+        if LocationDeadline.remaining() <= UPSTREAM_WAIT(retry_state):
+            return True
+        if not RetryBudget.try_spend(upstream):
+            logging.warning(f"Retry budget exhausted for {upstream}; not retrying.")
+            return True
+        return False
+    return stop
+
+def call_upstream(upstream: str, function, *args, **kwargs):
+    # Call an upstream dependency with bounded retries, the per-location deadline, the retry budget and the circuit breaker.
+    breaker = CircuitBreaker.for_upstream(upstream)
+    RetryBudget.record_call(upstream)
+
+    for attempt in Retrying(stop=stop_upstream_retries(upstream), wait=UPSTREAM_WAIT,
+                            retry=retry_if_not_exception_type(CircuitOpenError), reraise=True):
+        with attempt:
+            breaker.before_call()
+            try:
+                result = function(*args, **kwargs)
+            except Exception:
+                breaker.record_failure()
+                raise
+            breaker.record_success()
+            return result
+
+async def call_upstream_async(upstream: str, function, *args, **kwargs):
+    # Asyncio counterpart of call_upstream for coroutine functions, with the same retry, deadline, budget and breaker rules.
+    breaker = CircuitBreaker.for_upstream(upstream)
+    RetryBudget.record_call(upstream)
+
+    async for attempt in AsyncRetrying(stop=stop_upstream_retries(upstream), wait=UPSTREAM_WAIT,
+                                       retry=retry_if_not_exception_type(CircuitOpenError), reraise=True):
+        with attempt:
+            breaker.before_call()
+            try:
+                result = await function(*args, **kwargs)
+            except Exception:
+                breaker.record_failure()
+                raise
+            breaker.record_success()
+            return result
+
 class DatabasePool:
-    # Class representing a database connection pool manager.
-    _pool = None
-    _pool_mutex = threading.Lock()
-    _connection_queue = LifoQueue(maxsize=10)  # Updated to LIFO queue.
-    _active_connections = []
-
-    @staticmethod
-    def get_pool():
-        # Get the database connection pool. If the pool does not exist, creates a new one and returns it.
-        if DatabasePool._pool is None:
-            with DatabasePool._pool_mutex:
-                if DatabasePool._pool is None:
-                    config = ConfigParserWrapper('config.ini')
-                    db_credentials = config.get_database_credentials()
-                    # Adjust the minconn and maxconn values based on available resources and usage patterns.
-                    DatabasePool._pool = pool.ThreadedConnectionPool(minconn=1, maxconn=20,  # Adjust based on requirements.
-                                       user=db_credentials.user,
-                                       password=db_credentials.password,
-                                       host=db_credentials.host,
-                                       database=db_credentials.database)
-        return DatabasePool._pool
-
-
-    @staticmethod
-    def get_connection():
-        # Get a database connection from the connection pool.
-        conn = None
-        
-        if not DatabasePool._connection_queue.empty():  # Check if there's an available connection in the queue.
-            conn = DatabasePool._connection_queue.get()
-        else:
-            conn = DatabasePool.get_pool().getconn()
-            DatabasePool._active_connections.append(conn)  # Add to the active connections list.
-        
+    # Process-wide pool of Postgres connections with a single checkout path (get_connection / release_connection).
+    # Idle connections are reused most recently returned first, validated on borrow and recycled once they reach MAX_AGE.
+    # psycopg2's ThreadedConnectionPool is not used: it closes every returned connection beyond minconn, so busy runs kept reconnecting.
+    MAX_CONNECTIONS = 20
+    MAX_AGE = 1800.0  # Seconds before a connection is replaced, so server-side session state does not build up.
+    VALIDATE_AFTER_IDLE = 30.0  # Connections idle for longer are checked with a round trip before they are handed out.
+    CHECKOUT_TIMEOUT = 30.0
+    INSERT_STATEMENT = 'insert_weather_data'
+    _credentials = None
+    _mutex = threading.Lock()
+    _slots = None  # Semaphore limiting checked out connections to MAX_CONNECTIONS; callers wait on it when the pool is exhausted.
+    _idle = []  # (connection, returned_at), most recently returned last.
+    _sessions = {}  # Every open connection -> {'created_at', 'checked_out_at', 'prepared'}.
+    _stats = {}
+
+    @staticmethod
+    def configure(db_credentials: 'DatabaseCredentials') -> None:
+        # Use the given credentials instead of config.ini for connections opened from now on, e.g. for a local stand-in database.
+        DatabasePool._credentials = db_credentials
+
+    @staticmethod
+    def slots() -> threading.BoundedSemaphore:
+        # Return the checkout semaphore, creating it and the statistics on first use.
+        if DatabasePool._slots is None:
+            with DatabasePool._mutex:
+                if DatabasePool._slots is None:
+                    DatabasePool.reset_stats()
+                    DatabasePool._slots = threading.BoundedSemaphore(DatabasePool.MAX_CONNECTIONS)
+        return DatabasePool._slots
+
+    @staticmethod
+    def open_connection():
+        # Open a new connection and register its session.
+        db_credentials = DatabasePool._credentials or load_config().database_credentials
+        conn = psycopg2.connect(user=db_credentials.user, password=db_credentials.password, host=db_credentials.host, database=db_credentials.database)
+        with DatabasePool._mutex:
+            DatabasePool._sessions[conn] = {'created_at': time.monotonic(), 'checked_out_at': None, 'prepared': False}
+            DatabasePool._stats['opened'] += 1
         return conn
-    
+
+    @staticmethod
+    def close_connection(conn) -> None:
+        # Close a connection and forget its session.
+        with DatabasePool._mutex:
+            DatabasePool._sessions.pop(conn, None)
+        try:
+            conn.close()
+        except Exception as error:
+            logging.error(f"Error closing database connection: {error}")
+
+    @staticmethod
+    def is_usable(conn, returned_at: float, validate: bool) -> bool:
+        # Check an idle connection before handing it out: closed or too old connections are rejected,
+        # and connections that sat idle (or any connection when validate is set) must answer a trivial query.
+        session = DatabasePool._sessions.get(conn)
+        if conn.closed or session is None:
+            return False
+        now = time.monotonic()
+        if now - session['created_at'] > DatabasePool.MAX_AGE:
+            DatabasePool._stats['recycled'] += 1
+            return False
+        if validate or now - returned_at > DatabasePool.VALIDATE_AFTER_IDLE:
+            try:
+                with conn.cursor() as cursor:
+                    cursor.execute('SELECT 1;')
+                conn.rollback()
+            except (OperationalError, DatabaseError) as error:
+                logging.warning(f"Discarding database connection that failed validation: {error}")
+                DatabasePool._stats['failed_validations'] += 1
+                return False
+        return True
+
+    @staticmethod
+    def get_connection(validate: bool = False):
+        # Check out a connection, waiting up to CHECKOUT_TIMEOUT when all MAX_CONNECTIONS are in use.
+        # Idle connections are reused when they pass validation, otherwise a new one is opened.
+        started = time.monotonic()
+        if not DatabasePool.slots().acquire(timeout=DatabasePool.CHECKOUT_TIMEOUT):
+            raise pool.PoolError(f"Timed out after {DatabasePool.CHECKOUT_TIMEOUT:.0f} seconds waiting for a database connection.")
+        waited = time.monotonic() - started
+
+        try:
+            while True:
+                with DatabasePool._mutex:
+                    conn, returned_at = DatabasePool._idle.pop() if DatabasePool._idle else (None, None)
+                if conn is None:
+                    conn = DatabasePool.open_connection()
+                    break
+                if DatabasePool.is_usable(conn, returned_at, validate):
+                    break
+                DatabasePool.close_connection(conn)
+        except Exception:
+            DatabasePool._slots.release()
+            raise
+
+        with DatabasePool._mutex:
+            DatabasePool._sessions[conn]['checked_out_at'] = time.monotonic()
+            stats = DatabasePool._stats
+            stats['checkouts'] += 1
+            stats['wait_seconds'] += waited
+            stats['max_wait_seconds'] = max(stats['max_wait_seconds'], waited)
+            stats['in_use'] += 1
+            stats['peak_in_use'] = max(stats['peak_in_use'], stats['in_use'])
+        return conn
+
+    @staticmethod
+    def release_connection(conn, discard: bool = False) -> None:
+        # Return a checked out connection. Broken connections, or any connection when discard is set, are closed instead of reused.
+        try:
+            status = TRANSACTION_STATUS_UNKNOWN if conn.closed else conn.info.transaction_status
+            if discard or status == TRANSACTION_STATUS_UNKNOWN:
+                DatabasePool.close_connection(conn)
+            else:
+                if status != TRANSACTION_STATUS_IDLE:
+                    conn.rollback()  # Never hand out a connection with an open transaction.
+                with DatabasePool._mutex:
+                    DatabasePool._idle.append((conn, time.monotonic()))
+        except (OperationalError, DatabaseError):
+            DatabasePool.close_connection(conn)
+
+        finally:
+            with DatabasePool._mutex:
+                session = DatabasePool._sessions.get(conn)
+                if session is not None and session['checked_out_at'] is not None:
+                    DatabasePool._stats['busy_seconds'] += time.monotonic() - session['checked_out_at']
+                    session['checked_out_at'] = None
+                DatabasePool._stats['in_use'] -= 1
+            DatabasePool._slots.release()
+
+    @staticmethod
+    def get_healthy_connection():
+        # Check out a connection verified with a trivial query. Returns None if the database is unreachable.
+        try:
+            return DatabasePool.get_connection(validate=True)
+        except (OperationalError, DatabaseError, pool.PoolError) as error:
+            logging.warning(f"Database health check failed: {error}")
+            return None
+
+    @staticmethod
+    def discard_connection(conn):
+        # Close a broken connection instead of returning it to the pool for reuse.
+        DatabasePool.release_connection(conn, discard=True)
+
     @staticmethod
-    def release_connection(conn):
-        # Release a connection back to the connection pool.
-        DatabasePool._connection_queue.put(conn)
+    def prepare_insert(conn) -> str:
+        # Prepare the weather_data insert once per session and return the statement name to EXECUTE.
+        session = DatabasePool._sessions.get(conn)
+        if session is not None and session['prepared']:
+            return DatabasePool.INSERT_STATEMENT
+        with conn.cursor() as cursor:
+            cursor.execute(f'''
+            PREPARE {DatabasePool.INSERT_STATEMENT} (date, time, varchar, varchar, numeric, numeric, integer, jsonb) AS
+            INSERT INTO weather_data (date, time, location, weather_status, temperature, wind_speed, humidity, climate_data)
+            VALUES ($1, $2, $3, $4, $5, $6, $7, $8)
+            ''')
+        if session is not None:
+            session['prepared'] = True
+        return DatabasePool.INSERT_STATEMENT
+
+    @staticmethod
+    def reset_stats() -> None:
+        # Start a new statistics window.
+        DatabasePool._stats = {'checkouts': 0, 'opened': 0, 'recycled': 0, 'failed_validations': 0, 'wait_seconds': 0.0, 'max_wait_seconds': 0.0,
+                               'busy_seconds': 0.0, 'in_use': DatabasePool._stats.get('in_use', 0), 'peak_in_use': 0, 'started_at': time.monotonic()}
+
+    @staticmethod
+    def stats() -> dict:
+        # Return checkout counts, wait times and utilization (share of MAX_CONNECTIONS busy over the statistics window).
+        DatabasePool.slots()
+        with DatabasePool._mutex:
+            stats = DatabasePool._stats
+            checkouts = stats['checkouts']
+            elapsed = max(time.monotonic() - stats['started_at'], 1e-9)
+            return {
+                'checkouts': checkouts,
+                'opened': stats['opened'],
+                'recycled': stats['recycled'],
+                'failed_validations': stats['failed_validations'],
+                'in_use': stats['in_use'],
+                'peak_in_use': stats['peak_in_use'],
+                'idle': len(DatabasePool._idle),
+                'mean_wait_ms': stats['wait_seconds'] / checkouts * 1000 if checkouts else 0.0,
+                'max_wait_ms': stats['max_wait_seconds'] * 1000,
+                'utilization': stats['busy_seconds'] / (elapsed * DatabasePool.MAX_CONNECTIONS),
+            }
 
     @staticmethod
     def close_all_connections():
-        # Close all connections in the database connection pool if it exists.
-        for conn in DatabasePool._active_connections:
-            DatabasePool._pool.putconn(conn)
-        DatabasePool._active_connections.clear()
+        # Close every pooled connection, including any still checked out.
+        with DatabasePool._mutex:
+            connections = list(DatabasePool._sessions)
+            DatabasePool._idle.clear()
+        for conn in connections:
+            DatabasePool.close_connection(conn)
 
+    @staticmethod
     def cleanup():
         # Perform cleanup tasks by closing all connections.
         DatabasePool.close_all_connections()
@@ -176,12 +545,14 @@ class ConfigParserWrapper:
         self.config_parser = configparser.ConfigParser()
         self.config_parser.read(config_file)
 
-    def get_value(self, section: str, key: str) -> str:
-        # Gets the value from the config file for the given section and key.
+    def get_value(self, section: str, key: str, default: str = None) -> str:
+        # Gets the value from the config file for the given section and key. Returns the default if given and the value is missing.
         try:
             return self.config_parser.get(section, key)
         
         except (configparser.NoSectionError, configparser.NoOptionError) as config_parser_error:
+            if default is not None:
+                return default
             error_message = f"Error while reading config file: {config_parser_error}"
             logging.error(error_message)
             raise ValueError(error_message)
@@ -210,30 +581,175 @@ class ConfigParserWrapper:
             logging.error(error_message)
             raise RuntimeError(error_message)
 
+@dataclass(frozen=True, slots=True)
+class AppConfig:
+    # Immutable application configuration, parsed once per process by load_config.
+    config_file: str
+    api_key: str
+    database_credentials: DatabaseCredentials
+    nominatim_url: Union[str, None]
+    owm_proxy: Union[str, None]
+    location_file: str
+    processes: int
+    concurrency: int
+    scheduler: str
+    progress_store: str
+    resource_monitoring: bool
+    memory_profiling: bool
+    memory_profile_interval: float
+    values: MappingProxyType
+
+    def get_value(self, section: str, key: str) -> str:
+        # Gets a raw value for the given section and key.
+        try:
+            return self.values[section][key]
+        except KeyError as key_error:
+            error_message = f"Missing config value [{section}] {key}: {key_error}"
+            logging.error(error_message)
+            raise ValueError(error_message)
+
+    def api_config(self) -> APIConfig:
+        # Build the APIConfig used by the weather data fetcher.
+        return APIConfig(self.api_key, self.config_file, self.nominatim_url, self.owm_proxy)
+
+def load_config(config_file: str = 'config.ini') -> AppConfig:
+    # Return the immutable AppConfig of the config file, parsed once per process. The path is normalized first,
+    # so load_config(), load_config('config.ini') and an absolute path all share one cached object.
+    return parse_config(os.path.abspath(config_file))
+
+@lru_cache(maxsize=None)
+def parse_config(config_file: str) -> AppConfig:
+    # Parse the config file into an immutable AppConfig. Called through load_config with a normalized path.
+    config = ConfigParserWrapper(config_file)
+    scheduler = config.get_value('Workers', 'scheduler', 'threads').strip().lower()
+    if scheduler not in ('threads', 'dask', 'asyncio'):
+        raise ValueError(f"Unknown scheduler in config file: {scheduler}. Use 'threads', 'dask' or 'asyncio'.")
+
+    return AppConfig(
+        config_file=config_file,
+        api_key=config.get_value('API', 'api_key'),
+        database_credentials=config.get_database_credentials(),
+        nominatim_url=config.get_value('Endpoints', 'nominatim_url', '') or None,
+        owm_proxy=config.get_value('Endpoints', 'owm_proxy', '') or None,
+        location_file=config.get_value('Locations', 'file', 'locations.txt'),
+        processes=int(config.get_value('Workers', 'processes', '1')),
+        concurrency=int(config.get_value('Workers', 'concurrency', '1')),
+        scheduler=scheduler,
+        progress_store=config.get_value('Workers', 'progress_store', 'progress.db'),
+        resource_monitoring=config.config_parser.getboolean('Monitoring', 'resource_monitoring', fallback=True),
+        memory_profiling=config.config_parser.getboolean('Monitoring', 'memory_profiling', fallback=False),
+        memory_profile_interval=float(config.get_value('Monitoring', 'memory_profile_interval', '60')),
+        values=MappingProxyType({section: MappingProxyType(dict(config.config_parser[section])) for section in config.config_parser.sections()})
+    )
+
+def geocoder_errors() -> tuple:
+    # Return the geopy exceptions handled around geocoding. geopy is only imported once an error has to be classified.
+    from geopy.exc import GeocoderTimedOut, GeocoderServiceError
+    return (GeocoderTimedOut, GeocoderServiceError)
+
+@dataclass(frozen=True, slots=True)
 class WeatherInfo:
-    # Model for storing weather information for a location.
-    def __init__(self, date: str, time: str, temperature: float, humidity: int, wind_speed: float, weather_status: str):
-        # Initialize a WeatherInfo object.
-        self.date = date
-        self.time = time
-        self.temperature = temperature
-        self.humidity = humidity
-        self.wind_speed = wind_speed
-        self.weather_status = weather_status
+    # Immutable model for storing weather information for a location.
+    date: str
+    time: str
+    temperature: float
+    humidity: int
+    wind_speed: float
+    weather_status: str
+
+    @classmethod
+    def from_weather_data(cls, weather_data: dict) -> 'WeatherInfo':
+        # Build a WeatherInfo object from a normalized weather data dictionary.
+        return cls(weather_data['date'], weather_data['time'], weather_data['temperature'], weather_data['humidity'], weather_data['wind_speed'], weather_data['weather_status'])
 
     def __str__(self):
         # Get a string representation of the WeatherInfo object.
         return f"Date: {self.date}, Time: {self.time}, Temperature: {self.temperature}°C, Humidity: {self.humidity}%, Wind Speed: {self.wind_speed} m/s, Weather Status: {self.weather_status}"
 
+class ObservationSchema:
+    # Declarative schema of a normalized observation. The rules are compiled once into a validator that checks a record in a single pass.
+    TEMPERATURE_RANGE = (-50.0, 50.0)  # °C
+    HUMIDITY_RANGE = (0, 100)  # %
+    MPH_TO_MS = 0.44704
+
+    # (field, accepted types, minimum, maximum). Text fields have no bounds and must be non-empty.
+    FIELDS = (
+        ('date', str, None, None),
+        ('time', str, None, None),
+        ('location', str, None, None),
+        ('weather_status', str, None, None),
+        ('temperature', (int, float), *TEMPERATURE_RANGE),
+        ('wind_speed', (int, float), 0.0, float('inf')),
+        ('humidity', int, *HUMIDITY_RANGE),
+    )
+    _validator = None
+
+    @staticmethod
+    def compile(fields: tuple):
+        # Compile field rules into a function returning the problems found in a record (an empty list for a valid record).
+        rules = tuple((name, types, minimum, maximum, minimum is None) for name, types, minimum, maximum in fields)
+
+        def validator(record: dict) -> list:
+            problems = []
+            for name, types, minimum, maximum, is_text in rules:
+                value = record.get(name)
+                if value is None:
+                    problems.append(f"'{name}' is missing")
+                elif isinstance(value, bool) or not isinstance(value, types):
+                    problems.append(f"'{name}' has type {type(value).__name__}")
+                elif is_text:
+                    if not value:
+                        problems.append(f"'{name}' is empty")
+                elif not minimum <= value <= maximum:  # Also rejects NaN.
+                    problems.append(f"'{name}' is out of range [{minimum}, {maximum}]: {value}")
+            return problems
+
+        return validator
+
+    @classmethod
+    def problems(cls, record: dict) -> list:
+        # Return the problems found in a record.
+        if cls._validator is None:
+            cls._validator = cls.compile(cls.FIELDS)
+        return cls._validator(record)
+
+    @classmethod
+    def validate(cls, record: dict) -> dict:
+        # Validate a record and return it unchanged. Raises ValueError listing every problem found.
+        problems = cls.problems(record)
+        if problems:
+            raise ValueError(f"Invalid weather data: {'; '.join(problems)}.")
+        return record
+
+    @classmethod
+    def normalize_batch(cls, temperatures, humidities, wind_speeds) -> tuple:
+        # Clamp and convert whole columns at once. Wind speeds are converted from mph to m/s like normalize_wind_speed.
+        # Returns (temperatures, humidities, wind_speeds, rejected) where rejected marks rows with missing or non-finite input.
+        import numpy as np
+
+        temperatures = np.asarray(temperatures, dtype=np.float64)
+        humidities = np.asarray(humidities, dtype=np.float64)
+        wind_speeds = np.asarray(wind_speeds, dtype=np.float64)  # None becomes NaN and is rejected below.
+
+        rejected = ~(np.isfinite(temperatures) & np.isfinite(humidities) & np.isfinite(wind_speeds))
+
+        temperatures = np.clip(temperatures, *cls.TEMPERATURE_RANGE)
+        humidities = np.clip(np.nan_to_num(humidities), *cls.HUMIDITY_RANGE).round().astype(np.uint8)
+        wind_speeds = np.maximum(np.round(wind_speeds * cls.MPH_TO_MS, 2), 0.0)
+        return temperatures, humidities, wind_speeds, rejected
+
 class WeatherDataFetcher:
     # Class responsible for fetching weather data.
-    CACHE_SIZE = 256  # Adjust based on memory availability and access patterns.
+    CACHE_SIZE = 256  # Smallest cache size. Caches grow to the number of locations the fetcher is expected to serve.
     CACHE_TTL = 3600  # Adjust the TTL in seconds based on data freshness requirements.
     
-    def __init__(self, api_config: APIConfig) -> None:
-        # Initializes the WeatherDataFetcher with the specified API configuration.
-        self.weather_cache = TTLCache(maxsize=self.CACHE_SIZE, ttl=self.CACHE_TTL)
-        self.lru_cache = LRUCache(maxsize=128)  # Adding an LRU cache for faster access
+    def __init__(self, api_config: APIConfig, cache_size: int = None) -> None:
+        # Initializes the WeatherDataFetcher with the specified API configuration. Pass the number of locations
+        # as cache_size so the geocode and weather caches hold a whole shard instead of evicting within a cycle.
+        cache_size = max(self.CACHE_SIZE, cache_size or 0)
+        self.weather_cache = TTLCache(maxsize=cache_size, ttl=self.CACHE_TTL)
+        self.lru_cache = LRUCache(maxsize=cache_size)  # Adding an LRU cache for faster access
+        self.coordinates_cache = LRUCache(maxsize=cache_size)  # Coordinates per cleaned location name.
         self.cache_lock = threading.Lock()
         self.cache_hits = 0
         self.cache_misses = 0
@@ -247,6 +763,24 @@ class WeatherDataFetcher:
             logging.error(error_message)
             raise ValueError(error_message)
 
+        self.nominatim_url = api_config.nominatim_url
+        self.owm_proxy = api_config.owm_proxy
+        self.weather_manager = None
+
+    def get_weather_manager(self):
+        # Create the OWM weather manager once per fetcher. Requests go through the configured proxy if one is set.
+        if self.weather_manager is None:
+            from pyowm import OWM
+            from pyowm.utils.config import get_default_config
+
+            owm_config = get_default_config()
+            if self.owm_proxy:
+                owm_config['connection']['use_ssl'] = False
+                owm_config['connection']['use_proxy'] = True
+                owm_config['proxies'] = {'http': self.owm_proxy, 'https': self.owm_proxy}
+            self.weather_manager = OWM(self.api_key, owm_config).weather_manager()
+        return self.weather_manager
+
     def calculate_cache_hit_rate(self) -> float:
         # Calculate the cache hit rate by dividing the number of cache hits by the total number of accesses.
         if self.total_accesses == 0:
@@ -291,17 +825,15 @@ class WeatherDataFetcher:
     def get_config(cls, key: str) -> str:
         # Gets the configuration value from the config.ini file.
         try:
-            config = ConfigParserWrapper('config.ini')
-            return config.get_value('API', key)
+            return load_config().get_value('API', key)
         
         except ValueError as error:
             error_message = f"Configuration error: {error}"
             logging.error(error_message)
             raise RuntimeError(error_message)
 
-    @partial(lru_cache(maxsize=128))
     def get_coordinates(self, location: str) -> Union[Tuple[float, float], None]:
-        # Fetches the latitude and longitude coordinates for a given location.
+        # Fetches the latitude and longitude coordinates for a given location, using the coordinates cache first.
         try:
             # Remove special characters and non-alphanumeric characters from the location name.
             cleaned_location = re.sub(r'[^\w\s]', '', location)
@@ -310,11 +842,24 @@ class WeatherDataFetcher:
                 raise ValueError("Location cannot be empty or whitespace only.")
 
             with self.cache_lock:
-                coordinates = self.weather_cache.get(cleaned_location)
+                coordinates = self.coordinates_cache.get(cleaned_location)
                 if coordinates is not None:
                     return coordinates
 
-            geo_location = geocoder.osm(cleaned_location)
+            import geocoder
+
+            def geocode():
+                # geocoder reports HTTP failures on the result instead of raising, so turn them into errors for the retry and breaker logic.
+                if self.nominatim_url:
+                    result = geocoder.osm(cleaned_location, url=self.nominatim_url)
+                else:
+                    result = geocoder.osm(cleaned_location)
+                if getattr(result, 'error', False):
+                    raise RuntimeError(result.error)
+                return result
+
+            with StageMetrics.track('geocode'):
+                geo_location = call_upstream('nominatim', geocode)
             if geo_location.latlng is None:
                 return None
 
@@ -326,7 +871,7 @@ class WeatherDataFetcher:
             coordinates = (normalized_latitude, normalized_longitude)
 
             with self.cache_lock:
-                self.weather_cache[cleaned_location] = {'coordinates': coordinates}
+                self.coordinates_cache[cleaned_location] = coordinates
             return coordinates
         
         except ValueError as value_error:
@@ -334,7 +879,7 @@ class WeatherDataFetcher:
             logging.error(error_message)
             raise RuntimeError(error_message)
         
-        except (GeocoderTimedOut, GeocoderServiceError) as geocoder_error:
+        except geocoder_errors() as geocoder_error:
             error_message = f"Error getting coordinates for location: {cleaned_location}. {geocoder_error}"
             logging.error(error_message)
             raise RuntimeError(error_message)
@@ -344,13 +889,11 @@ class WeatherDataFetcher:
             logging.error(error_message)
             raise RuntimeError(error_message)
 
-    @retry(stop=stop_after_attempt(3), wait=wait_exponential(multiplier=1, min=4, max=10))
     def get_current_weather(self, latitude: float, longitude: float) -> Tuple[str, str, Any]:
-        # Gets the current weather data for a given latitude and longitude.
+        # Gets the current weather data for a given latitude and longitude. Retries are handled by call_upstream.
         try:
-            owm = OWM(self.api_key)
-            weather_manager = owm.weather_manager()
-            observation = weather_manager.weather_at_coords(latitude, longitude)
+            with StageMetrics.track('weather'):
+                observation = call_upstream('owm', self.get_weather_manager().weather_at_coords, latitude, longitude)
             current_date = datetime.now().strftime('%Y-%m-%d')
             current_time = datetime.now().strftime('%H:%M:%S')
             weather = observation.weather
@@ -363,10 +906,11 @@ class WeatherDataFetcher:
             logging.error(error_message)
             raise RuntimeError(error_message)
 
-    def fetch_weather_data(self, location: str, lazy_load: bool = True) -> None:
-        # Fetches weather data for a given location and stores it in the cache.
+    def fetch_weather_data(self, location: str, lazy_load: bool = True, writer: 'ObservationWriter' = None) -> None:
+        # Fetches weather data for a given location and stores it in the cache. Observations are handed to the writer stage if one is given.
         try:
             logging.info(f"Fetching weather data for location: {location}")
+            LocationDeadline.start()
 
             # Normalize the location name to title case.
             normalized_location = location.title()
@@ -387,9 +931,9 @@ class WeatherDataFetcher:
             if not location_data:
                 raise ValueError(f"Error fetching weather data for location: {normalized_location}. Data is None.")
 
-            # Check for missing or null weather_data before further processing.
-            if not location_data.get_additional_info() or not self.validate_weather_data(location_data.get_additional_info()):
-                raise RuntimeError(f"Weather data missing or invalid for location: {normalized_location}.")
+            # The weather data was validated once when it was built, so only its presence is checked here.
+            if not location_data.get_additional_info():
+                raise RuntimeError(f"Weather data missing for location: {normalized_location}.")
 
             if location_data and not lazy_load:
                 # Protect access to the shared weather_cache with a lock.
@@ -398,30 +942,37 @@ class WeatherDataFetcher:
                     logging.info(f"Weather data fetched from API and stored in cache for location: {normalized_location}")
 
             weather_data = location_data.get_additional_info()
-            weather_info = WeatherInfo(weather_data['date'], weather_data['time'], weather_data['temperature'], weather_data['humidity'], weather_data['wind_speed'], weather_data['weather_status'])
-
-            try:
-            # Validate the data before insertion.
-                location_data.validate_data()
-
-            except ValueError as value_error:
-                logging.error(value_error)
-                raise RuntimeError(value_error)
+            weather_info = WeatherInfo.from_weather_data(weather_data)
 
             logging.info(f"As of: {weather_data['date']} | {weather_data['time']}")
             logging.info(f"Current weather at {location}: {weather_info}")
 
-            with DatabaseHandler() as database_handler:
+            # Skip the database and JSON writes when the upstream observation has not changed since the last poll.
+            if not ObservationTracker.has_changed(weather_data):
+                ObservationTracker.record_skipped()
+                logging.info(f"Observation unchanged since last poll for location: {normalized_location}. Skipping writes.")
+                if writer is not None:
+                    writer.submit(location, None)
+                return
+
+            if writer is not None:
+                # Hand the observation to the background writer; this blocks only when the writer falls behind.
+                writer.submit(location, weather_data)
+                return
+
+            with StageMetrics.track('db_write'), DatabaseHandler() as database_handler:
                 database_handler.insert_data(weather_data)
 
-            with JSONHandler() as json_handler:
+            with StageMetrics.track('json_write'), JSONHandler() as json_handler:
                 json_handler.update_json_data(weather_data)
 
+            ObservationTracker.record_written(weather_data)
+
         except ValueError as value_error:
             logging.error(value_error)
             raise RuntimeError(value_error, f"Error fetching weather data for location: {normalized_location}")
         
-        except (GeocoderTimedOut, GeocoderServiceError) as geocoder_error:
+        except geocoder_errors() as geocoder_error:
             error_message = f"Error getting coordinates for location: {normalized_location}. {geocoder_error}"
             logging.error(error_message)
             raise RuntimeError(error_message)
@@ -442,53 +993,22 @@ class WeatherDataFetcher:
         finally:
             logging.info(f"Finished processing location: {location}")
 
-    def validate_weather_data(self, data: dict) -> bool:
-        # Verify the retrieved weather data for consistency and validity.
-        required_keys = ['date', 'time', 'temperature', 'humidity', 'wind_speed', 'weather_status']
-        if all(key in data for key in required_keys):
-            if all([isinstance(data[key], str) for key in ['date', 'time', 'weather_status']]):
-                if all([isinstance(data[key], (int, float)) for key in ['temperature', 'humidity', 'wind_speed']]):
-                    return True
-        return False
-
-    @retry(stop=stop_after_attempt(3), wait=wait_exponential(multiplier=1, min=4, max=10))
     def fetch_weather_data_from_api(self, location: str) -> Union[LocationData, None]:
-        # Fetches weather data for a location from the API.
+        # Fetches weather data for a location from the API. Upstream calls retry individually, so this method does not retry again.
         try:
             coordinates = self.get_coordinates(location)
             if coordinates:
                 latitude, longitude = coordinates
 
-                with self.cache_lock:
-                    current_date, current_time, weather, wind, humidity = self.get_current_weather(latitude, longitude)
-                    if weather:
-                        temperature = float(weather.temperature('celsius')['temp'])
-
-                        # Data normalization.
-                        temperature = self.normalize_temperature(temperature)
-                        humidity = self.normalize_humidity(humidity)
-                        wind_speed = self.normalize_wind_speed(wind['speed'])
-
-                        weather_status = weather.status
-                        # Normalize weather status to lowercase.
-                        weather_status = self.normalize_text_to_lowercase(weather_status)
-
-                        weather_data = {
-                            'date': current_date,
-                            'time': current_time,
-                            'location': location,
-                            'weather_status': weather_status,
-                            'temperature': temperature,
-                            'wind_speed': wind_speed,
-                            'humidity': humidity,
-                        }
-                        # Create an instance of the WeatherInfo class with the fetched weather data.
-                        weather_info = WeatherInfo(weather_data['date'], weather_data['time'], weather_data['temperature'],
-                                                weather_data['humidity'], weather_data['wind_speed'], weather_data['weather_status'])
-                        return LocationData(location, latitude, longitude, weather_data)
-                    else:
-                        logging.error(f"Unable to fetch weather data for {location}.")
-                        raise RuntimeError(f"Unable to fetch weather data for {location}.")
+                # No lock is held here: the upstream call and its retries must not block other fetch threads.
+                current_date, current_time, weather, wind, humidity = self.get_current_weather(latitude, longitude)
+                if weather:
+                    weather_data = self.build_weather_data(location, current_date, current_time, float(weather.temperature('celsius')['temp']),
+                                                           humidity, wind['speed'], weather.status, weather.reference_time())
+                    return LocationData(location, latitude, longitude, weather_data)
+                else:
+                    logging.error(f"Unable to fetch weather data for {location}.")
+                    raise RuntimeError(f"Unable to fetch weather data for {location}.")
             else:
                 logging.error(f"Unable to fetch coordinates for {location}.")
                 raise RuntimeError(f"Unable to fetch coordinates for {location}.")
@@ -498,28 +1018,50 @@ class WeatherDataFetcher:
             logging.error(error_message)
             raise RuntimeError(error_message)
     
-    def normalize_text_to_lowercase(self, text: str) -> str:
+    @classmethod
+    def build_weather_data(cls, location: str, current_date: str, current_time: str, temperature: float, humidity: int,
+                           wind_speed: float, weather_status: str, reference_time: int) -> dict:
+        # Build the normalized weather data dictionary shared by the threaded and asyncio fetch engines.
+        # This is the only place observations are validated; the storage stages trust the dictionary.
+        return ObservationSchema.validate({
+            'date': current_date,
+            'time': current_time,
+            'location': location.strip(),
+            # Normalize weather status to lowercase and strip whitespace once, so storage needs no cleaning copy.
+            'weather_status': cls.normalize_text_to_lowercase(weather_status).strip(),
+            'temperature': cls.normalize_temperature(temperature),
+            'wind_speed': cls.normalize_wind_speed(wind_speed),
+            'humidity': cls.normalize_humidity(humidity),
+            'reference_time': reference_time,  # Upstream observation timestamp (unix) used for change detection.
+        })
+
+    @staticmethod
+    def normalize_text_to_lowercase(text: str) -> str:
         # Normalize text data to lowercase for uniformity.
         return text.lower()
         
-    def normalize_temperature(self, temperature: float) -> float:
+    @staticmethod
+    def normalize_temperature(temperature: float) -> float:
         # Normalize temperature to a common scale or range.
-        return max(-50.0, min(temperature, 50.0))  # Normalize temperature within the range of -50°C to 50°C.
+        minimum, maximum = ObservationSchema.TEMPERATURE_RANGE
+        return max(minimum, min(temperature, maximum))  # Normalize temperature within the range of -50°C to 50°C.
 
-    def normalize_humidity(self, humidity: int) -> int:
+    @staticmethod
+    def normalize_humidity(humidity: int) -> int:
         # Normalize humidity to a common scale or range.
-        return max(0, min(humidity, 100))  # Example: Ensure humidity percentage is within [0, 100].
+        minimum, maximum = ObservationSchema.HUMIDITY_RANGE
+        return max(minimum, min(humidity, maximum))  # Example: Ensure humidity percentage is within [0, 100].
 
-    def normalize_wind_speed(self, wind_speed: float) -> float:
+    @staticmethod
+    def normalize_wind_speed(wind_speed: float) -> float:
         # Normalize wind speed to a common unit or scale.
-        return max(0.0, round((wind_speed * 0.44704), 2))  # Convert wind speed from mph to m/s with 2 decimal places.
+        return max(0.0, round((wind_speed * ObservationSchema.MPH_TO_MS), 2))  # Convert wind speed from mph to m/s with 2 decimal places.
 
 class SchemaManager:
     # A class to manage the schema of the weather data table.
-    @staticmethod
-    def create_weather_data_table():
-        # Create the initial schema for the weather data table.
-        create_table_query = '''
+    # Ordered schema migrations as (version, description, SQL). Append new steps with the next version number; never edit applied ones.
+    MIGRATIONS = [
+        (1, "Create weather_data table", '''
         CREATE TABLE IF NOT EXISTS weather_data (
             id SERIAL PRIMARY KEY,
             date DATE,
@@ -531,127 +1073,183 @@ class SchemaManager:
             humidity INTEGER,
             climate_data JSONB
         );
-        '''
+        '''),
+        (2, "Create weather_data indexes", '''
+        CREATE INDEX IF NOT EXISTS idx_date ON weather_data (date);
+        CREATE INDEX IF NOT EXISTS idx_time ON weather_data (time);
+        CREATE INDEX IF NOT EXISTS idx_location ON weather_data (location);
+        CREATE INDEX IF NOT EXISTS idx_temperature ON weather_data (temperature);
+        CREATE INDEX IF NOT EXISTS idx_weather_status ON weather_data (weather_status);
+        CREATE INDEX IF NOT EXISTS idx_climate_data ON weather_data (climate_data);
+        '''),
+        (3, "Create hourly and daily weather aggregate tables", '''
+        CREATE TABLE IF NOT EXISTS weather_data_hourly (
+            location VARCHAR(255) NOT NULL,
+            bucket TIMESTAMP NOT NULL,
+            sample_count INTEGER NOT NULL,
+            temperature_min NUMERIC,
+            temperature_max NUMERIC,
+            temperature_sum NUMERIC NOT NULL DEFAULT 0,
+            temperature_mean NUMERIC GENERATED ALWAYS AS (temperature_sum / NULLIF(sample_count, 0)) STORED,
+            dominant_status VARCHAR(50),
+            dominant_status_count INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (location, bucket)
+        );
+        CREATE INDEX IF NOT EXISTS idx_hourly_bucket ON weather_data_hourly (bucket);
+        CREATE TABLE IF NOT EXISTS weather_data_daily (
+            location VARCHAR(255) NOT NULL,
+            date DATE NOT NULL,
+            sample_count INTEGER NOT NULL,
+            temperature_min NUMERIC,
+            temperature_max NUMERIC,
+            temperature_sum NUMERIC NOT NULL DEFAULT 0,
+            temperature_mean NUMERIC GENERATED ALWAYS AS (temperature_sum / NULLIF(sample_count, 0)) STORED,
+            dominant_status VARCHAR(50),
+            dominant_status_count INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (location, date)
+        );
+        '''),
+        (4, "Keep per-status sample counts in the weather aggregates", '''
+        ALTER TABLE weather_data_hourly ADD COLUMN IF NOT EXISTS status_counts JSONB NOT NULL DEFAULT '{}';
+        ALTER TABLE weather_data_daily ADD COLUMN IF NOT EXISTS status_counts JSONB NOT NULL DEFAULT '{}';
+        -- Aggregates written before this version only know their dominant status.
+        UPDATE weather_data_hourly SET status_counts = jsonb_build_object(dominant_status, dominant_status_count) WHERE dominant_status IS NOT NULL;
+        UPDATE weather_data_daily SET status_counts = jsonb_build_object(dominant_status, dominant_status_count) WHERE dominant_status IS NOT NULL;
+        CREATE OR REPLACE FUNCTION merge_status_counts(a JSONB, b JSONB) RETURNS JSONB LANGUAGE sql IMMUTABLE AS $$
+            SELECT coalesce(jsonb_object_agg(key, total), '{}')
+            FROM (SELECT key, sum(value::integer) AS total
+                  FROM (SELECT * FROM jsonb_each_text(a) UNION ALL SELECT * FROM jsonb_each_text(b)) AS counts
+                  GROUP BY key) AS merged
+        $$;
+        CREATE OR REPLACE FUNCTION dominant_status(counts JSONB) RETURNS TEXT LANGUAGE sql IMMUTABLE AS $$
+            SELECT key FROM jsonb_each_text(counts) ORDER BY value::integer DESC, key LIMIT 1
+        $$;
+        CREATE OR REPLACE FUNCTION dominant_status_count(counts JSONB) RETURNS INTEGER LANGUAGE sql IMMUTABLE AS $$
+            SELECT coalesce(max(value::integer), 0) FROM jsonb_each_text(counts)
+        $$;
+        '''),
+    ]
+    MIGRATION_LOCK_ID = 2024043001  # Advisory lock key that serializes migrations across workers starting at once.
+    _schema_checked = False
+
+    @staticmethod
+    def latest_version() -> int:
+        # Return the schema version the code expects.
+        return SchemaManager.MIGRATIONS[-1][0]
+
+    @staticmethod
+    def current_version(cursor) -> int:
+        # Return the applied schema version with a single query. Returns 0 if the version table does not exist yet.
         try:
-            with DatabaseHandler() as database_handler:
-                database_handler.create_cursor(database_handler.conn).execute(create_table_query)
-                database_handler.conn.commit()
-                logging.info("Created weather_data table successfully.")
-        except (OperationalError, DatabaseError) as error:
-            error_message = f"Error creating weather_data table: {error}"
-            logging.error(error_message)
-            raise ValueError(error_message)
+            cursor.execute('SELECT coalesce(max(version), 0) FROM schema_version;')
+            return cursor.fetchone()[0]
+        except UndefinedTable:
+            cursor.connection.rollback()
+            return 0
 
     @staticmethod
-    def alter_weather_data_table():
-        # Alter the schema of the weather data table as needed.
-        alter_table_query = '''
-        ALTER TABLE weather_data ADD COLUMN IF NOT EXISTS temperature_upper_limit NUMERIC;
-        '''
+    def migrate() -> int:
+        # Bring the schema to the latest version. At the current version this costs one query and no DDL. Returns the schema version.
+        if SchemaManager._schema_checked:
+            return SchemaManager.latest_version()
+
         try:
             with DatabaseHandler() as database_handler:
-                database_handler.create_cursor(database_handler.conn).execute(alter_table_query)
-                database_handler.conn.commit()
-                logging.info("Altered weather_data table successfully.")
+                conn = database_handler.conn
+                with database_handler.create_cursor(conn) as cursor:
+                    version = SchemaManager.current_version(cursor)
+                    conn.commit()
+                    if version < SchemaManager.latest_version():
+                        version = SchemaManager.apply_migrations(conn, cursor)
+
+            SchemaManager._schema_checked = True
+            return version
+
         except (OperationalError, DatabaseError) as error:
-            error_message = f"Error altering weather_data table: {error}"
+            error_message = f"Error migrating weather_data schema: {error}"
             logging.error(error_message)
             raise ValueError(error_message)
 
     @staticmethod
-    def optimize_query_performance():
-        # Perform optimizations like creating indexes and analyzing table data for the weather data table.
-        with DatabaseHandler() as database_handler:
-            database_handler.create_indexes()
-            logging.info("Database query performance optimizations completed.")
+    def apply_migrations(conn, cursor) -> int:
+        # Apply pending migrations in order, each in its own transaction, while holding the migration lock.
+        cursor.execute('SELECT pg_advisory_lock(%s);', (SchemaManager.MIGRATION_LOCK_ID,))
+        conn.commit()
+        try:
+            cursor.execute('''
+            CREATE TABLE IF NOT EXISTS schema_version (
+                version INTEGER PRIMARY KEY,
+                description TEXT,
+                applied_at TIMESTAMPTZ DEFAULT now()
+            );
+            ''')
+            conn.commit()
+            # Re-check under the lock, since another worker may have migrated in the meantime.
+            version = SchemaManager.current_version(cursor)
+            for migration_version, description, migration_sql in SchemaManager.MIGRATIONS:
+                if migration_version <= version:
+                    continue
+                cursor.execute(migration_sql)
+                cursor.execute('INSERT INTO schema_version (version, description) VALUES (%s, %s);', (migration_version, description))
+                conn.commit()
+                version = migration_version
+                logging.info(f"Applied schema migration {migration_version}: {description}.")
+            return version
+        except (OperationalError, DatabaseError):
+            conn.rollback()
+            raise
+        finally:
+            cursor.execute('SELECT pg_advisory_unlock(%s);', (SchemaManager.MIGRATION_LOCK_ID,))
+            conn.commit()
 
 class DatabaseHandler:
     # A helper class to interact with a PostgreSQL database.
+    def __init__(self, conn=None) -> None:
+        # Use the given connection if provided (the caller keeps ownership), otherwise borrow one from the pool on enter.
+        self.conn = conn
+        self.owns_connection = conn is None
+
     def __enter__(self):
         # Get a connection from the database pool when entering the context.
+        if not self.owns_connection:
+            return self
         try:
-            self.conn = DatabasePool.get_pool().getconn()
+            self.conn = DatabasePool.get_connection()
             return self
         
-        except (OperationalError, DatabaseError) as error:
+        except (OperationalError, DatabaseError, pool.PoolError) as error:
             error_message = f"Error connecting to the database: {error}"
             logging.error(error_message)
             raise ValueError(error_message)
 
     def __exit__(self, exc_type, exc_val, exc_tb):
         # Put the database connection back to the pool when exiting the context.
-        DatabasePool.get_pool().putconn(self.conn)
+        if not self.owns_connection or self.conn is None:
+            return
+        # Broken connections are closed by the pool instead of being reused.
+        DatabasePool.release_connection(self.conn)
         self.conn = None
-        
-        # Close the database connection if it's not None.
-        if self.conn:
-            try:
-                self.conn.close()
-                logging.info("Closing database connection.")
-            except Exception as e:
-                logging.error(f"Error closing database connection: {e}")
-            self.conn = None
 
     @staticmethod
     def create_cursor(conn):
         # Create and return a cursor object for database interaction.
         return conn.cursor()
     
-    def create_indexes(self):
-        # Create necessary indexes on the weather_data table for improved query performance.
-        try:
-            with self.create_cursor(self.conn) as cursor:
-                indexes = [
-                    'idx_date',
-                    'idx_time',
-                    'idx_location',
-                    'idx_temperature',
-                    'idx_weather_status',
-                    'idx_climate_data'
-                ]
-                
-                for index_name in indexes:
-                    # Check if the index already exists.
-                    cursor.execute(sql.SQL('SELECT count(*) FROM pg_indexes WHERE indexname = %s;'), (index_name,))
-                    count = cursor.fetchone()[0]
-
-                    if count == 0:
-                        if index_name.startswith('idx_'):
-                            column = index_name[4:]  # Get the column name for indexing.
-                            cursor.execute(sql.SQL('CREATE INDEX {} ON weather_data ({});').format(sql.Identifier(index_name), sql.Identifier(column.lower())))
-                
-                self.conn.commit()
-
-                logging.info("Indexes created for improved query performance.")
-        except (OperationalError, DatabaseError) as error:
-            error_message = f"Error creating indexes: {error}"
-            logging.error(error_message)
-            raise ValueError(error_message)
-
     def insert_data(self, data: dict) -> None:
+        # Insert a single observation. It was normalized and validated by the fetcher, so the dictionary is used as is.
+        # The insert is prepared once per pooled connection, so it is not parsed and planned again for every row.
         try:
-            # Missing data handling and normalization.
-            cleaned_data = {k: data[k].strip() if isinstance(data[k], str) else data[k] for k in data}
-            
-            # Check for missing or null data.
-            required_keys = ['date', 'time', 'location', 'weather_status', 'temperature', 'wind_speed', 'humidity']
-            if any(key not in cleaned_data for key in required_keys):
-                raise ValueError("One or more weather data fields are missing.")
-
             with self.create_cursor(self.conn) as cursor:
-                query = '''
-                INSERT INTO weather_data (date, time, location, weather_status, temperature, wind_speed, humidity, climate_data) 
-                VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
-                '''
+                query = f'EXECUTE {DatabasePool.prepare_insert(self.conn)} (%s, %s, %s, %s, %s, %s, %s, %s)'
                 values = (
-                    cleaned_data['date'],
-                    cleaned_data['time'],
-                    cleaned_data['location'],
-                    cleaned_data['weather_status'],
-                    cleaned_data['temperature'],
-                    cleaned_data['wind_speed'],
-                    cleaned_data['humidity'],
-                    json.dumps(cleaned_data)  # Convert dictionary to JSON string for insertion into the jsonb column.
+                    data['date'],
+                    data['time'],
+                    data['location'],
+                    data['weather_status'],
+                    data['temperature'],
+                    data['wind_speed'],
+                    data['humidity'],
+                    json.dumps(data)  # Convert dictionary to JSON string for insertion into the jsonb column.
                 )
                 cursor.execute(query, values)
                 self.conn.commit()
@@ -671,17 +1269,71 @@ class DatabaseHandler:
             logging.error(error_message)
             raise ValueError(error_message)
     
-    def create_initial_schema(self):
-        # Create the initial schema for the application.
-        SchemaManager.create_weather_data_table()
-        
+    def insert_buffer(self, buffer: 'ObservationBuffer', payloads: list) -> None:
+        # Insert all observations held in a columnar buffer through the connection's prepared insert.
+        # payloads holds the climate_data JSON of each row, as serialized once by ObservationBuffer.json_payloads.
+        # execute_batch sends the EXECUTE statements in pages, so a batch still needs only a few round trips.
+        if not len(buffer):
+            return
+        try:
+            with self.create_cursor(self.conn) as cursor:
+                query = f'EXECUTE {DatabasePool.prepare_insert(self.conn)} (%s, %s, %s, %s, %s, %s, %s, %s)'
+                values = [row + (payload,) for row, payload in zip(buffer.rows(), payloads)]
+                execute_batch(cursor, query, values, page_size=len(values))
+                self.conn.commit()
+
+                logging.info(f"Inserted {len(values)} buffered weather data rows into the database successfully.")
+
+        except (OperationalError, DatabaseError) as db_error:
+            logging.error(f"Database error occurred during batch insertion: {db_error}")
+            raise ValueError(db_error)
+
+    def copy_records(self, records: list, delete_query: str = None, delete_params: tuple = None) -> None:
+        # Bulk load weather data dictionaries into the weather_data table with COPY.
+        # An optional delete runs in the same transaction, so reloading a range replaces earlier rows instead of duplicating them.
+        stream = io.StringIO()
+        writer = csv.writer(stream)
+        for data in records:
+            writer.writerow([data['date'], data['time'], data['location'], data['weather_status'], data['temperature'], data['wind_speed'], data['humidity'], json.dumps(data)])
+        stream.seek(0)
+
+        try:
+            with self.create_cursor(self.conn) as cursor:
+                if delete_query is not None:
+                    cursor.execute(delete_query, delete_params)
+                cursor.copy_expert('COPY weather_data (date, time, location, weather_status, temperature, wind_speed, humidity, climate_data) FROM STDIN WITH (FORMAT csv)', stream)
+            self.conn.commit()
+            logging.info(f"Copied {len(records)} weather data rows into the database successfully.")
+
+        except (OperationalError, DatabaseError) as db_error:
+            self.conn.rollback()
+            logging.error(f"Database error occurred during COPY: {db_error}")
+            raise ValueError(db_error)
+
 class JSONHandler:    
     # Context manager class responsible for handling JSON file operations.
+    # The lock is shared by all handlers so concurrent threads cannot interleave their read-modify-write cycles.
+    lock = threading.Lock()
+    LOCK_FILE = 'weather_data.json.lock'
+    JSON_TAIL_BYTES = 4096  # Bytes read from the end of the JSON file to find the closing bracket.
+
     def __init__(self) -> None:
         # Constructor for JSONHandler class.
-        self.lock = threading.Lock()
         self.file = None
 
+    @contextmanager
+    def process_lock(self):
+        # Hold an exclusive file lock so worker processes update the JSON file one at a time.
+        if fcntl is None:
+            yield
+            return
+        with open(self.LOCK_FILE, 'w') as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
     @contextmanager
     def lock_acquire(self):
         # Acquires the lock.
@@ -737,35 +1389,32 @@ class JSONHandler:
             self.file = None
 
     def update_json_data(self, weather_data: dict) -> None:
-        # Update JSON data with the provided weather data dictionary after validating the data.
-        try:
-            # Cleanse data before updating JSON file.
-            cleaned_data = {k: str(weather_data[k]).strip() if isinstance(weather_data[k], str) else weather_data[k] for k in weather_data}
+        # Append a single weather data dictionary to the JSON file.
+        self.append_json_records([weather_data])
 
-            # Validate the data before writing to the JSON file.
-            if 'date' not in cleaned_data or 'time' not in cleaned_data or 'location' not in cleaned_data or 'weather_status' not in cleaned_data \
-                or 'temperature' not in cleaned_data or 'wind_speed' not in cleaned_data or 'humidity' not in cleaned_data:
-                raise ValueError("One or more required fields missing in the weather data.")
+    def append_json_records(self, records: list) -> None:
+        # Append weather data records to the JSON file. Records are validated when the fetcher builds them.
+        self.append_json_payloads([json.dumps(weather_data) for weather_data in records])
 
-            for key in ['date', 'time', 'location', 'weather_status']:
-                if not cleaned_data[key]:
-                    raise ValueError(f"Invalid value for field '{key}' in weather data.")
-
-            for key in ['temperature', 'wind_speed', 'humidity']:
-                if not isinstance(cleaned_data[key], (int, float)) or not 0 <= cleaned_data[key] <= 100:
-                    raise ValueError(f"Invalid value for field '{key}' in weather data. Must be a number between 0 and 100.")
-
-            with self.open_json_file('weather_data.json', 'r') as file:
-                existing_data = json.load(file)
-
-            cleaned_data['version'] = 2  # Update the version number.
-
-            # Update with normalized, cleaned data.
-            existing_data.append(cleaned_data)
-
-            with self.open_json_file('weather_data.json', 'w') as file:
-                json.dump(existing_data, file, indent=4)
-                logging.info("Updated JSON data with weather data.")
+    def append_json_payloads(self, payloads: list) -> None:
+        # Append serialized weather data objects to the JSON array in place. Only the closing bracket is rewritten,
+        # so the existing records are neither parsed nor written again.
+        try:
+            with self.process_lock():
+                with self.open_json_file('weather_data.json', 'rb+') as file:
+                    tail_start = max(0, file.seek(0, os.SEEK_END) - self.JSON_TAIL_BYTES)
+                    file.seek(tail_start)
+                    tail = file.read().rstrip()
+                    if not tail.endswith(b']'):
+                        raise ValueError("weather_data.json does not hold a JSON array.")
+                    separator = b'' if tail[:-1].rstrip().endswith(b'[') else b','
+
+                    # Tag each record with the version number.
+                    items = b',\n    '.join(payload[:-1].encode('utf-8') + b', "version": 2}' for payload in payloads)
+                    file.seek(tail_start + len(tail) - 1)  # Overwrite the closing bracket.
+                    file.write(separator + b'\n    ' + items + b'\n]\n')
+                    file.truncate()
+                    logging.info(f"Updated JSON data with {len(payloads)} weather data record(s).")
 
         except ValueError as value_error:
             logging.error(f"Value Error occurred while updating JSON data: {value_error}")
@@ -780,24 +1429,505 @@ class JSONHandler:
             logging.error(error_message)
             raise RuntimeError("An unexpected error occurred during JSON update.")
 
-def process_location(fetcher, location):
-    # Helper method to process weather data fetching for a single location.
-    conn = DatabasePool.get_connection()
+class ObservationBuffer:
+    # Array-backed columnar buffer holding in-flight observations for batch runs.
+    # Numeric fields live in typed arrays and repeated strings are interned, so no per-observation dictionaries are kept.
+    __slots__ = ('dates', 'times', 'locations', 'weather_statuses', 'temperatures', 'wind_speeds', 'humidities', 'reference_times', '_lock')
+    MISSING_REFERENCE_TIME = -1
+
+    def __init__(self) -> None:
+        # Initialize empty columns.
+        self.dates = []
+        self.times = []
+        self.locations = []
+        self.weather_statuses = []
+        self.temperatures = array('d')
+        self.wind_speeds = array('d')
+        self.humidities = array('B')  # Humidity is normalized to [0, 100].
+        self.reference_times = array('q')
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        # Return the number of buffered observations.
+        return len(self.temperatures)
+
+    @classmethod
+    def row_of(cls, weather_data: dict) -> tuple:
+        # Convert a normalized observation into a compact row, so the dictionary can be released as soon as it is queued.
+        reference_time = weather_data.get('reference_time')
+        return (weather_data['date'], weather_data['time'], weather_data['location'], weather_data['weather_status'], weather_data['temperature'],
+                weather_data['wind_speed'], weather_data['humidity'], cls.MISSING_REFERENCE_TIME if reference_time is None else reference_time)
+
+    def append(self, row: tuple) -> None:
+        # Append an observation row built by row_of to the columns.
+        date, observed_time, location, weather_status, temperature, wind_speed, humidity, reference_time = row
+        with self._lock:
+            self.dates.append(sys.intern(date))
+            self.times.append(observed_time)
+            self.locations.append(sys.intern(location))
+            self.weather_statuses.append(sys.intern(weather_status))
+            self.temperatures.append(temperature)
+            self.wind_speeds.append(wind_speed)
+            self.humidities.append(humidity)
+            self.reference_times.append(reference_time)
+
+    def rows(self):
+        # Yield the buffered observations as tuples in weather_data table column order.
+        return zip(self.dates, self.times, self.locations, self.weather_statuses, self.temperatures, self.wind_speeds, self.humidities)
+
+    def json_payloads(self) -> list:
+        # Serialize every buffered observation as a JSON object straight from the columns, with the keys of build_weather_data.
+        # The same strings are used for the jsonb column, the spool and the JSON file. Interned values are encoded once per batch.
+        encode = json.encoder.encode_basestring_ascii
+        encoded = {}
+
+        def encode_interned(value: str) -> str:
+            text = encoded.get(value)
+            if text is None:
+                text = encoded[value] = encode(value)
+            return text
+
+        return [
+            f'{{"date": {encode_interned(date)}, "time": {encode(observed_time)}, "location": {encode_interned(location)}, '
+            f'"weather_status": {encode_interned(weather_status)}, "temperature": {temperature!r}, "wind_speed": {wind_speed!r}, '
+            f'"humidity": {humidity}, "reference_time": {"null" if reference_time == self.MISSING_REFERENCE_TIME else reference_time}}}'
+            for date, observed_time, location, weather_status, temperature, wind_speed, humidity, reference_time
+            in zip(self.dates, self.times, self.locations, self.weather_statuses, self.temperatures, self.wind_speeds, self.humidities, self.reference_times)
+        ]
+
+    def clear(self) -> None:
+        # Drop all buffered observations.
+        with self._lock:
+            for column in (self.dates, self.times, self.locations, self.weather_statuses):
+                column.clear()
+            for column in (self.temperatures, self.wind_speeds, self.humidities, self.reference_times):
+                del column[:]
+
+class ObservationSpool:
+    # Append-only local write-ahead spool for observations that could not be written to Postgres.
+    # Worker processes each get their own spool file (see run_worker); the file lock also keeps separate runs sharing a file apart.
+    SPOOL_FILE = 'weather_spool.jsonl'
+    SPOOL_PATTERN = 'weather_spool*.jsonl'  # Matches the spool files of every worker count and mode.
+    _mutex = threading.Lock()
+
+    def __init__(self, spool_file: str = None) -> None:
+        # Initialize the spool with its file path. The replay file holds a spool that is being loaded into Postgres.
+        self.spool_file = spool_file or self.SPOOL_FILE
+        self.replay_file = f"{self.spool_file}.replaying"
+        self.lock_file = f"{self.spool_file}.lock"
+
+    @contextmanager
+    def locked(self):
+        # Hold the spool exclusively: the mutex covers threads of this process and the file lock covers other processes.
+        with self._mutex:
+            if fcntl is None:
+                yield
+                return
+            with open(self.lock_file, 'w') as lock_file:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def append(self, payloads: list) -> None:
+        # Append serialized records as JSON lines, with a single fsync for the whole batch.
+        with self.locked():
+            with open(self.spool_file, 'a', encoding='utf-8') as file:
+                file.writelines(payload + '\n' for payload in payloads)
+                file.flush()
+                os.fsync(file.fileno())
+        logging.warning(f"Spooled {len(payloads)} observation(s) to {self.spool_file} while the database is unavailable.")
+
+    def has_pending(self) -> bool:
+        # Check if there are spooled records waiting to be replayed.
+        return os.path.exists(self.replay_file) or (os.path.exists(self.spool_file) and os.path.getsize(self.spool_file) > 0)
+
+    def read_records(self, file_path: str) -> list:
+        # Read spooled records. A torn last line from a crash mid-append is skipped.
+        records = []
+        with open(file_path, 'r', encoding='utf-8') as file:
+            for line in file:
+                try:
+                    records.append(json.loads(line))
+                except json.JSONDecodeError:
+                    logging.warning(f"Skipping unreadable line in spool file {file_path}.")
+        return records
+
+    def replay(self, conn) -> int:
+        # Load all spooled records into Postgres with COPY. Each file is deleted only after its COPY commits. Returns the number of rows loaded.
+        # The lock is held until the replay file is removed, so no other process can load the same file a second time.
+        replayed = 0
+        with self.locked():
+            # A replay file left by an interrupted replay is loaded first, then the current spool is moved aside and loaded.
+            while self.has_pending():
+                if not os.path.exists(self.replay_file):
+                    os.replace(self.spool_file, self.replay_file)
+
+                records = self.read_records(self.replay_file)
+                if records:
+                    with DatabaseHandler(conn) as database_handler:
+                        database_handler.copy_records(records)
+                os.remove(self.replay_file)
+                replayed += len(records)
+        if replayed:
+            logging.info(f"Replayed {replayed} spooled observation(s) from {self.spool_file} into the database.")
+        return replayed
+
+    @classmethod
+    def replay_all(cls) -> int:
+        # Replay every spool in the working directory, including those left by a run with a different number of processes.
+        # Returns the number of rows loaded.
+        spool_files = set(glob.glob(cls.SPOOL_PATTERN))
+        spool_files.update(replay_file[:-len('.replaying')] for replay_file in glob.glob(f"{cls.SPOOL_PATTERN}.replaying"))
+        if not spool_files:
+            return 0
+        with DatabaseHandler() as database_handler:
+            return sum(cls(spool_file).replay(database_handler.conn) for spool_file in sorted(spool_files))
+
+class ObservationWriter:
+    # Background writer stage between the fetch workers and storage.
+    # Fetch workers put observations on a bounded queue; a single thread writes them in batches on its own connection.
+    QUEUE_SIZE = 1000  # Fetch workers block (backpressure) once this many observations are waiting.
+    BATCH_SIZE = 500  # Maximum observations written per batch.
+    FLUSH_INTERVAL = 1.0  # Seconds to wait for more observations before writing a partial batch.
+    HEALTH_CHECK_INTERVAL = 5.0  # Seconds between reconnection attempts while the database is unavailable.
+    _STOP = object()
+
+    def __init__(self, progress_store: 'ProgressStore' = None) -> None:
+        # Initialize the writer. Call start() before submitting observations.
+        self.progress_store = progress_store
+        self.queue = Queue(maxsize=self.QUEUE_SIZE)
+        self.buffer = ObservationBuffer()
+        self.pending_locations = []
+        self.thread = None
+        self.conn = None
+        self.spool = ObservationSpool()
+        self.last_health_check = 0.0
+        self.backpressure_waits = 0
+        self.failed_batches = 0
+        self.spooled_records = 0
+
+    def start(self) -> 'ObservationWriter':
+        # Check out the writer's own connection and start the writer thread. If the database is down, observations are spooled.
+        self.ensure_connection()
+        self.thread = threading.Thread(target=self.run, name='observation-writer', daemon=True)
+        self.thread.start()
+        return self
+
+    def submit(self, location: str, weather_data: Union[dict, None], block: bool = True) -> None:
+        # Queue an observation for writing. None only marks the location as completed. Blocks while the queue is full,
+        # or raises queue.Full instead when block is False.
+        item = (location, None if weather_data is None else ObservationBuffer.row_of(weather_data))
+        try:
+            self.queue.put_nowait(item)
+        except Full:
+            if not block:
+                raise
+            self.backpressure_waits += 1
+            self.queue.put(item)
+
+    def run(self) -> None:
+        # Writer thread loop: collect observations into batches and write them.
+        while True:
+            try:
+                item = self.queue.get(timeout=self.FLUSH_INTERVAL)
+            except Empty:
+                self.flush()
+                if self.ensure_connection():  # Replay the spool as soon as the database is back, even when idle.
+                    self.replay_spool()
+                continue
+
+            if item is self._STOP:
+                self.flush()
+                return
+
+            location, row = item
+            if row is not None:
+                self.buffer.append(row)
+            self.pending_locations.append(location)
+            if len(self.pending_locations) >= self.BATCH_SIZE:
+                self.flush()
+
+    def ensure_connection(self) -> bool:
+        # Make sure the writer holds a healthy connection, replaying any spooled records after reconnecting.
+        # While the database is unavailable, reconnection is attempted at most once per health check interval.
+        if self.conn is not None:
+            return True
+        if time.monotonic() - self.last_health_check < self.HEALTH_CHECK_INTERVAL:
+            return False
+        self.last_health_check = time.monotonic()
+
+        self.conn = DatabasePool.get_healthy_connection()
+        if self.conn is None:
+            return False
+        return self.replay_spool()
+
+    def replay_spool(self) -> bool:
+        # Replay any spooled records on the writer's connection. Returns False, and drops the connection, if the replay fails.
+        try:
+            if self.spool.has_pending():
+                SchemaManager.migrate()
+                self.spool.replay(self.conn)
+        except (ValueError, OperationalError, DatabaseError, OSError) as error:
+            logging.error(f"Error replaying the observation spool: {error}")
+            self.drop_connection()
+            return False
+        return True
+
+    def drop_connection(self) -> None:
+        # Discard the writer's connection after a failure.
+        if self.conn is not None:
+            DatabasePool.discard_connection(self.conn)
+            self.conn = None
+
+    def write_database(self, payloads: list) -> None:
+        # Insert the current batch into Postgres, or append its serialized records to the local spool if the database is unavailable.
+        # Spooled records are replayed first, so they keep their order and never wait for the connection to drop again.
+        if self.ensure_connection() and self.replay_spool():
+            try:
+                with StageMetrics.track('db_write'), DatabaseHandler(self.conn) as database_handler:
+                    database_handler.insert_buffer(self.buffer, payloads)
+                return
+            except (ValueError, OperationalError, DatabaseError) as error:
+                logging.error(f"Error writing a batch of {len(payloads)} observation(s) to the database: {error}")
+                self.drop_connection()
+
+        self.spool.append(payloads)
+        self.spooled_records += len(payloads)
+
+    def flush(self) -> None:
+        # Write the current batch and mark its locations as completed.
+        if not self.pending_locations:
+            return
+        try:
+            # Each observation is serialized once; the database, the spool and the JSON file share the payloads.
+            payloads = self.buffer.json_payloads()
+            if payloads:
+                self.write_database(payloads)
+                with StageMetrics.track('json_write'), JSONHandler() as json_handler:
+                    json_handler.append_json_payloads(payloads)
+                ObservationTracker.record_written_buffer(self.buffer)
+            if self.progress_store is not None:
+                self.progress_store.mark_completed(self.pending_locations)
+        except Exception as error:
+            self.failed_batches += 1
+            logging.error(f"Error writing a batch of {len(self.buffer)} observation(s): {error}")
+        self.buffer.clear()
+        self.pending_locations = []
+
+    def close(self) -> None:
+        # Write everything still queued, stop the writer thread and return its connection to the pool.
+        if self.thread is None:
+            return
+        self.queue.put(self._STOP)
+        self.thread.join()
+        self.thread = None
+        if self.conn is not None:
+            DatabasePool.release_connection(self.conn)
+            self.conn = None
+        logging.info(f"Observation writer stopped. Backpressure waits: {self.backpressure_waits}, spooled records: {self.spooled_records}, failed batches: {self.failed_batches}.")
+
+    def __enter__(self):
+        # Start the writer when entering the context.
+        return self.start()
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        # Drain and stop the writer when exiting the context.
+        self.close()
+
+class ObservationTracker:
+    # Class tracking the last written observation per location to skip redundant writes.
+    # The state is kept per location in the SQLite progress store, so it does not depend on the number of worker processes.
+    STATE_STORE = 'progress.db'  # Set to the configured progress store by main and run_worker.
+    HASHED_FIELDS = ('location', 'weather_status', 'temperature', 'wind_speed', 'humidity')
+    enabled = True  # Disabled by the benchmark, where replayed observations never change.
+    _state = None
+    _changed = set()  # Locations written since the state was last saved.
+    _state_mutex = threading.Lock()
+    skipped_records = 0
+    written_records = 0
+
+    @staticmethod
+    def load_state() -> dict:
+        # Load the last written observation per location from the progress store. Returns an empty state if it is unreadable.
+        if ObservationTracker._state is None:
+            with ObservationTracker._state_mutex:
+                if ObservationTracker._state is None:
+                    try:
+                        ObservationTracker._state = ProgressStore(ObservationTracker.STATE_STORE).observation_state()
+                    except sqlite3.Error as state_error:
+                        logging.error(f"Error reading observation state, starting with an empty state: {state_error}")
+                        ObservationTracker._state = {}
+        return ObservationTracker._state
+
+    @staticmethod
+    def content_hash(weather_data: dict) -> str:
+        # Hash the normalized fields of an observation. Fetch date and time are excluded since they change on every poll.
+        return ObservationTracker.hash_values([weather_data.get(key) for key in ObservationTracker.HASHED_FIELDS])
+
+    @staticmethod
+    def hash_values(values: list) -> str:
+        # Hash the values of HASHED_FIELDS, in that order.
+        return hashlib.sha1(json.dumps(values, default=str).encode('utf-8')).hexdigest()
+
+    @staticmethod
+    def has_changed(weather_data: dict) -> bool:
+        # Check if the observation differs from the last one written for its location.
+        if not ObservationTracker.enabled:
+            return True
+        state = ObservationTracker.load_state()
+        with ObservationTracker._state_mutex:
+            previous = state.get(weather_data['location'])
+        if previous is None:
+            return True
+
+        reference_time = weather_data.get('reference_time')
+        if reference_time is not None and previous.get('reference_time') is not None:
+            return reference_time != previous['reference_time']
+        return ObservationTracker.content_hash(weather_data) != previous.get('content_hash')
+
+    @staticmethod
+    def record_written(weather_data: dict) -> None:
+        # Remember the observation that was just written for its location.
+        state = ObservationTracker.load_state()
+        with ObservationTracker._state_mutex:
+            state[weather_data['location']] = {
+                'reference_time': weather_data.get('reference_time'),
+                'content_hash': ObservationTracker.content_hash(weather_data)
+            }
+            ObservationTracker._changed.add(weather_data['location'])
+            ObservationTracker.written_records += 1
+
+    @staticmethod
+    def record_written_buffer(buffer: 'ObservationBuffer') -> None:
+        # Remember the last observation written for each location of a buffer, read straight from its columns.
+        state = ObservationTracker.load_state()
+        entries = {
+            location: {
+                'reference_time': None if reference_time == ObservationBuffer.MISSING_REFERENCE_TIME else reference_time,
+                'content_hash': ObservationTracker.hash_values([location, weather_status, temperature, wind_speed, humidity])
+            }
+            for location, weather_status, temperature, wind_speed, humidity, reference_time
+            in zip(buffer.locations, buffer.weather_statuses, buffer.temperatures, buffer.wind_speeds, buffer.humidities, buffer.reference_times)
+        }
+        with ObservationTracker._state_mutex:
+            state.update(entries)
+            ObservationTracker._changed.update(entries)
+            ObservationTracker.written_records += len(buffer)
+
+    @staticmethod
+    def record_skipped() -> None:
+        # Count an observation that was skipped because it did not change.
+        with ObservationTracker._state_mutex:
+            ObservationTracker.skipped_records += 1
+
+    @staticmethod
+    def save_state() -> None:
+        # Persist the observations written by this process so the next run can detect unchanged data.
+        # Only changed locations are saved, so processes sharing the store never overwrite each other's newer entries.
+        if ObservationTracker._state is None:
+            return
+        with ObservationTracker._state_mutex:
+            changed = {location: ObservationTracker._state[location] for location in ObservationTracker._changed}
+            ObservationTracker._changed.clear()
+        try:
+            ProgressStore(ObservationTracker.STATE_STORE).save_observation_state(changed)
+            logging.info(f"Observation records written: {ObservationTracker.written_records}, skipped as unchanged: {ObservationTracker.skipped_records}.")
+        except sqlite3.Error as state_error:
+            logging.error(f"Error saving observation state: {state_error}")
+
+class LocationRegistry:
+    # Registry of locations to collect, loaded from a file with one location per line.
+    DEFAULT_LOCATIONS = ["Angeles, PH", "Mabalacat City, PH", "Magalang, PH"]
+
+    def __init__(self, locations: list) -> None:
+        # Initialize the registry with de-duplicated, sorted and interned location names.
+        self.locations = sorted({sys.intern(location.strip()) for location in locations if location.strip()})
+
+    def __len__(self) -> int:
+        # Return the number of registered locations.
+        return len(self.locations)
+
+    @classmethod
+    def from_file(cls, file_path: str) -> 'LocationRegistry':
+        # Load locations from a text file. Blank lines and lines starting with '#' are ignored.
+        try:
+            with open(file_path, 'r', encoding='utf-8') as file:
+                return cls([line for line in file if not line.lstrip().startswith('#')])
+        except FileNotFoundError:
+            logging.warning(f"Location file not found: {file_path}. Using the default locations.")
+            return cls(cls.DEFAULT_LOCATIONS)
+
+    @staticmethod
+    def shard_of(location: str, num_shards: int) -> int:
+        # Map a location to a shard with a hash that is stable across processes and restarts.
+        return zlib.crc32(location.encode('utf-8')) % num_shards
+
+    def shard(self, shard_index: int, num_shards: int) -> list:
+        # Return the locations assigned to the given shard.
+        return [location for location in self.locations if self.shard_of(location, num_shards) == shard_index]
+
+class ProgressStore:
+    # SQLite-backed store of locations completed in the current collection cycle, shared by all worker processes.
+    # It also keeps the last written observation per location for change detection across cycles.
+    def __init__(self, db_path: str) -> None:
+        # Open the progress database and create the progress and observation state tables if needed.
+        self.db_path = db_path
+        with self.connect() as conn:
+            conn.execute('CREATE TABLE IF NOT EXISTS completed_locations (location TEXT PRIMARY KEY, completed_at REAL)')
+            conn.execute('CREATE TABLE IF NOT EXISTS observation_state (location TEXT PRIMARY KEY, reference_time INTEGER, content_hash TEXT)')
+
+    def connect(self) -> sqlite3.Connection:
+        # Open a connection that waits on locks held by other workers.
+        return sqlite3.connect(self.db_path, timeout=30)
+
+    def completed_locations(self) -> set:
+        # Return the locations already completed in the current cycle.
+        with self.connect() as conn:
+            return {row[0] for row in conn.execute('SELECT location FROM completed_locations')}
+
+    def mark_completed(self, locations: list) -> None:
+        # Record locations as completed in the current cycle.
+        if not locations:
+            return
+        completed_at = time.time()
+        with self.connect() as conn:
+            conn.executemany('INSERT OR REPLACE INTO completed_locations VALUES (?, ?)', [(location, completed_at) for location in locations])
+
+    def reset(self) -> None:
+        # Start a new collection cycle. The observation state is kept.
+        with self.connect() as conn:
+            conn.execute('DELETE FROM completed_locations')
+
+    def observation_state(self) -> dict:
+        # Return the last written observation per location as {location: {'reference_time', 'content_hash'}}.
+        with self.connect() as conn:
+            return {location: {'reference_time': reference_time, 'content_hash': content_hash}
+                    for location, reference_time, content_hash in conn.execute('SELECT location, reference_time, content_hash FROM observation_state')}
+
+    def save_observation_state(self, state: dict) -> None:
+        # Insert or replace the last written observation of the given locations.
+        if not state:
+            return
+        with self.connect() as conn:
+            conn.executemany('INSERT OR REPLACE INTO observation_state VALUES (?, ?, ?)',
+                             [(location, entry['reference_time'], entry['content_hash']) for location, entry in state.items()])
+
+def process_location(fetcher, location, writer=None) -> bool:
+    # Helper method to process weather data fetching for a single location. Returns True if the location was processed successfully.
+    # No database connection is held here, so fetching continues at full speed while the database is unavailable.
     try:
-        fetcher.fetch_weather_data(location)
+        fetcher.fetch_weather_data(location, writer=writer)
+        return True
     except Exception as error:
         logging.error(f"Error processing location {location}: {error}")
-    finally:
-        # Check if the connection is still valid before releasing it.
-        if conn and conn.closed == 0:
-            DatabasePool.release_connection(conn)
-        else:
-            logging.error("Invalid database connection. Discarding and creating a new connection.")
-            if conn:
-                conn.close()
+        return False
 
 def monitor_resources():
     # Monitor system resources during script execution.
+    import psutil
+
     logging.info("Resource Usage Monitoring:")
     process = psutil.Process()
 
@@ -821,40 +1951,321 @@ def monitor_resources():
     finally:
         logging.info("Weather data collection completed. Terminating resource monitoring.")
 
+class MemoryProfiler:
+    # Periodic tracemalloc snapshots and object counts for the structures that can grow without bound in a long run.
+    # Growth is reported against the first snapshot, taken one interval after start, so start-up allocations are not counted.
+    TOP_SITES = 10
+    TRACEBACK_FRAMES = 5
+    _stop_event = threading.Event()
+    _baseline = None
+    _baseline_counts = None
+
+    @staticmethod
+    def structure_counts() -> dict:
+        # Count the entries held by the connection pool and fetcher caches.
+        import gc
+
+        fetchers = [obj for obj in gc.get_objects() if isinstance(obj, WeatherDataFetcher)]
+        return {
+            'pool.sessions': len(DatabasePool._sessions),
+            'pool.idle': len(DatabasePool._idle),
+            'fetchers.alive': len(fetchers),
+            'fetchers.coordinates_cache': sum(len(fetcher.coordinates_cache) for fetcher in fetchers),
+            'fetchers.weather_cache': sum(len(fetcher.weather_cache) for fetcher in fetchers),
+            'fetchers.lru_cache': sum(len(fetcher.lru_cache) for fetcher in fetchers),
+            'tracker.state': len(ObservationTracker._state or ()),
+            'metrics.samples': sum(len(samples) for samples in StageMetrics._samples.values()),
+        }
+
+    @classmethod
+    def report(cls) -> None:
+        # Log the top-growing allocation sites and the structure counts, both relative to the baseline.
+        import tracemalloc
+
+        snapshot = tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, '<frozen importlib._bootstrap*>'),
+        ))
+        counts = cls.structure_counts()
+        if cls._baseline is None:
+            cls._baseline, cls._baseline_counts = snapshot, counts
+            logging.info(f"Memory profiling baseline taken: {tracemalloc.get_traced_memory()[0] / (1024*1024):.2f} MB traced.")
+            return
+
+        current, peak = tracemalloc.get_traced_memory()
+        logging.info(f"Memory profile: {current / (1024*1024):.2f} MB traced (peak {peak / (1024*1024):.2f} MB).")
+        growing = [stat for stat in snapshot.compare_to(cls._baseline, 'traceback') if stat.size_diff > 0][:cls.TOP_SITES]
+        for stat in growing:
+            frame = stat.traceback[0]
+            logging.info(f"  +{stat.size_diff / 1024:.1f} KiB +{stat.count_diff} blocks at {frame.filename}:{frame.lineno}")
+
+        for name, count in counts.items():
+            growth = count - cls._baseline_counts.get(name, 0)
+            logging.info(f"  {name}: {count} ({growth:+d} since baseline)")
+
+    @classmethod
+    def run(cls, interval: float) -> None:
+        # Take a snapshot every interval seconds until stopped, then a final one.
+        import tracemalloc
+
+        tracemalloc.start(cls.TRACEBACK_FRAMES)
+        logging.info(f"Memory profiling started, reporting every {interval:.0f} seconds.")
+        try:
+            while not cls._stop_event.wait(interval):
+                cls.report()
+            cls.report()
+
+        except Exception as profiling_error:
+            logging.error(f"Error occurred during memory profiling: {profiling_error}")
+
+        finally:
+            tracemalloc.stop()
+
+    @classmethod
+    def start(cls, interval: float) -> threading.Thread:
+        # Start profiling in a daemon thread.
+        cls._stop_event.clear()
+        profiler_thread = threading.Thread(target=cls.run, args=(interval,), name='memory-profiler', daemon=True)
+        profiler_thread.start()
+        return profiler_thread
+
+    @classmethod
+    def stop(cls, profiler_thread: threading.Thread) -> None:
+        # Stop profiling and wait for the final report.
+        cls._stop_event.set()
+        profiler_thread.join()
+
+def log_run_summary() -> None:
+    # Log upstream retry usage and database pool statistics for the finished run.
+    for upstream, usage in RetryBudget.summary().items():
+        logging.info(f"Upstream {upstream}: {usage['calls']} call(s), {usage['retries']} retry(ies).")
+    pool_stats = DatabasePool.stats()
+    logging.info(f"Database pool: {pool_stats['checkouts']} checkout(s), {pool_stats['opened']} connection(s) opened, {pool_stats['recycled']} recycled, "
+                 f"mean wait {pool_stats['mean_wait_ms']:.1f}ms (max {pool_stats['max_wait_ms']:.1f}ms), peak {pool_stats['peak_in_use']} in use, "
+                 f"utilization {pool_stats['utilization']:.1%}.")
+
+def collect_weather_data(api_config: APIConfig, locations: list, progress_store: ProgressStore, chunk_size: int = 1, scheduler: str = 'threads') -> None:
+    # Fetch and store weather data for the given locations, skipping locations already completed in this cycle.
+    completed = progress_store.completed_locations()
+    pending_locations = [location for location in locations if location not in completed]
+    if len(pending_locations) < len(locations):
+        logging.info(f"Resuming collection cycle: {len(locations) - len(pending_locations)} location(s) already completed.")
+
+    if scheduler == 'asyncio':
+        # One event loop keeps up to chunk_size requests in flight instead of one thread per concurrent location.
+        # asyncio is imported here, so the threaded and Dask engines do not pay for it at startup.
+        import asyncio
+
+        asyncio.run(collect_weather_data_async(api_config, pending_locations, progress_store, chunk_size))
+        return
+
+    # A single fetcher per process keeps the geocode and weather caches warm across locations. They are sized for the whole shard.
+    fetcher = WeatherDataFetcher(api_config, cache_size=len(locations))
+
+    # Fetch workers hand observations to the background writer, which persists them in batches and records progress.
+    # The chunk size is the number of locations fetched concurrently; tune it to resource availability.
+    with ObservationWriter(progress_store) as writer:
+        if scheduler == 'dask':
+            from dask import delayed, compute  # Only loaded when Dask is selected as the scheduler.
+
+            for i in range(0, len(pending_locations), chunk_size):
+                chunk = pending_locations[i:i + chunk_size]
+                compute(*[delayed(process_location)(fetcher, location, writer) for location in chunk], num_workers=len(chunk))
+        else:
+            with ThreadPoolExecutor(max_workers=max(1, chunk_size), thread_name_prefix='weather-fetch') as executor:
+                list(executor.map(lambda location: process_location(fetcher, location, writer), pending_locations))
+
+    log_run_summary()
+
+class AsyncWeatherDataFetcher:
+    # Asyncio fetch engine that calls the Nominatim and OWM current weather HTTP endpoints directly through one pooled httpx client.
+    # It produces the same normalized LocationData as WeatherDataFetcher.
+    NOMINATIM_URL = 'https://nominatim.openstreetmap.org/search'
+    OWM_WEATHER_URL = 'https://api.openweathermap.org/data/2.5/weather'
+    USER_AGENT = 'weather_app/1.0'  # Nominatim's usage policy requires an identifying user agent.
+    GEOCODE_CACHE_SIZE = 100000  # Coordinates rarely change, so keep enough for the whole location registry.
+    REQUEST_TIMEOUT = 10.0
+
+    def __init__(self, api_config: APIConfig, max_in_flight: int = 200) -> None:
+        # Initialize the fetcher. The HTTP client is created when entering the async context.
+        if not WeatherDataFetcher.validate_api_key(api_config.api_key):
+            error_message = "Invalid API Key"
+            logging.error(error_message)
+            raise ValueError(error_message)
+
+        self.api_key = api_config.api_key
+        self.nominatim_url = api_config.nominatim_url or self.NOMINATIM_URL
+        # The replay server routes by path, so the OWM proxy URL can be used as the OWM host directly.
+        self.owm_weather_url = f"{api_config.owm_proxy.rstrip('/')}/data/2.5/weather" if api_config.owm_proxy else self.OWM_WEATHER_URL
+        self.max_in_flight = max_in_flight
+        self.coordinates_cache = LRUCache(maxsize=self.GEOCODE_CACHE_SIZE)
+        self.client = None
+
+    async def __aenter__(self):
+        # Open the pooled HTTP client, sized for the number of requests kept in flight.
+        import httpx
+
+        limits = httpx.Limits(max_connections=self.max_in_flight, max_keepalive_connections=self.max_in_flight)
+        self.client = httpx.AsyncClient(limits=limits, timeout=self.REQUEST_TIMEOUT, headers={'User-Agent': self.USER_AGENT})
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        # Close the HTTP client and its connections.
+        await self.client.aclose()
+        self.client = None
+
+    async def get_json(self, url: str, params: dict):
+        # GET a URL and return the decoded JSON body. HTTP error statuses raise.
+        response = await self.client.get(url, params=params)
+        response.raise_for_status()
+        return response.json()
+
+    async def get_coordinates(self, cleaned_location: str) -> Union[Tuple[float, float], None]:
+        # Fetch the latitude and longitude for a location from Nominatim, using the coordinates cache first.
+        if cleaned_location in self.coordinates_cache:
+            return self.coordinates_cache[cleaned_location]
+
+        with StageMetrics.track('geocode'):
+            results = await call_upstream_async('nominatim', self.get_json, self.nominatim_url,
+                                                {'q': cleaned_location, 'format': 'jsonv2', 'addressdetails': 1, 'limit': 1})
+        if not results:
+            return None
+
+        # Normalize latitude and longitude values to 4 decimal places for precision.
+        coordinates = (round(float(results[0]['lat']), 4), round(float(results[0]['lon']), 4))
+        self.coordinates_cache[cleaned_location] = coordinates
+        return coordinates
+
+    async def fetch_location_data(self, location: str) -> LocationData:
+        # Fetch and normalize the current weather for a location.
+        normalized_location = WeatherDataFetcher.normalize_text_to_lowercase(location.title())
+        if normalized_location.strip() == "":
+            raise ValueError("Location cannot be empty or whitespace only.")
+
+        # Remove special characters and non-alphanumeric characters from the location name, as the threaded engine does.
+        coordinates = await self.get_coordinates(re.sub(r'[^\w\s]', '', normalized_location))
+        if coordinates is None:
+            raise RuntimeError(f"Unable to fetch coordinates for {normalized_location}.")
+        latitude, longitude = coordinates
+
+        with StageMetrics.track('weather'):
+            observation = await call_upstream_async('owm', self.get_json, self.owm_weather_url,
+                                                    {'lat': latitude, 'lon': longitude, 'appid': self.api_key})
+        now = datetime.now()
+        weather_data = WeatherDataFetcher.build_weather_data(
+            normalized_location, now.strftime('%Y-%m-%d'), now.strftime('%H:%M:%S'),
+            round(float(observation['main']['temp']) - 273.15, 2),  # OWM reports Kelvin by default; pyowm rounds Celsius the same way.
+            observation['main']['humidity'], observation['wind']['speed'], observation['weather'][0]['main'], observation['dt'])
+        return LocationData(normalized_location, latitude, longitude, weather_data)
+
+    async def process_location(self, location: str, writer: 'ObservationWriter') -> bool:
+        # Fetch one location's observation and hand it to the writer. Returns True if the location was processed successfully.
+        try:
+            LocationDeadline.start()
+            location_data = await self.fetch_location_data(location)  # Validated once while it is built.
+            weather_data = location_data.get_additional_info()
+
+            if not ObservationTracker.has_changed(weather_data):
+                ObservationTracker.record_skipped()
+                weather_data = None
+
+            try:
+                writer.submit(location, weather_data, block=False)
+            except Full:
+                # Wait for the writer off the event loop so other requests keep flowing.
+                import asyncio
+
+                await asyncio.to_thread(writer.submit, location, weather_data)
+            return True
+
+        except Exception as error:
+            logging.error(f"Error processing location {location}: {error}")
+            return False
+
+async def collect_weather_data_async(api_config: APIConfig, locations: list, progress_store: ProgressStore, max_in_flight: int = 200) -> None:
+    # Fetch weather data for the given locations on one event loop with at most max_in_flight locations in progress.
+    import asyncio
+
+    pending = iter(locations)
+
+    async def fetch_worker(fetcher: AsyncWeatherDataFetcher, writer: 'ObservationWriter') -> None:
+        # Pull locations until none are left. A fixed set of workers avoids creating one task per location.
+        for location in pending:
+            await fetcher.process_location(location, writer)
+
+    async with AsyncWeatherDataFetcher(api_config, max_in_flight) as fetcher:
+        with ObservationWriter(progress_store) as writer:
+            await asyncio.gather(*(fetch_worker(fetcher, writer) for _ in range(max(1, min(max_in_flight, len(locations))))))
+
+    log_run_summary()
+
+def run_worker(worker_index: int, num_workers: int, config_file: str) -> None:
+    # Worker process entry point that collects weather data for its shard of the location registry.
+    atexit.register(DatabasePool.cleanup)
+    config = load_config(config_file)
+    # Each worker spools to its own file. Change detection state is kept per location in the shared progress store.
+    ObservationSpool.SPOOL_FILE = f"weather_spool.{worker_index}.jsonl"
+    ObservationTracker.STATE_STORE = config.progress_store
+    atexit.register(ObservationTracker.save_state)
+
+    locations = LocationRegistry.from_file(config.location_file).shard(worker_index, num_workers)
+    logging.info(f"Worker {worker_index} of {num_workers} started with {len(locations)} location(s).")
+    profiler_thread = MemoryProfiler.start(config.memory_profile_interval) if config.memory_profiling else None
+    collect_weather_data(config.api_config(), locations, ProgressStore(config.progress_store), config.concurrency, config.scheduler)
+    if profiler_thread is not None:
+        MemoryProfiler.stop(profiler_thread)
+
+def run_workers(num_workers: int, config_file: str) -> bool:
+    # Start one process per shard and wait for them. Returns True if every worker finished successfully.
+    context = multiprocessing.get_context('spawn')  # Fresh interpreters, so no worker inherits the parent's pool connections.
+    workers = [context.Process(target=run_worker, args=(worker_index, num_workers, config_file), name=f"weather-worker-{worker_index}")
+               for worker_index in range(num_workers)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+        if worker.exitcode != 0:
+            logging.error(f"{worker.name} exited with code {worker.exitcode}.")
+    return all(worker.exitcode == 0 for worker in workers)
+
 def main():
     # Main function that fetches weather data from API for multiple locations concurrently.
     try:
-        config = ConfigParserWrapper('config.ini')
-        api_key = config.get_value('API', 'api_key')
-        api_config = APIConfig(api_key, 'config.ini')
-        locations = sorted(["Angeles, PH", "Mabalacat City, PH", "Magalang, PH"])
-        resource_monitor_thread = threading.Thread(target=monitor_resources)
+        config = load_config('config.ini')
+        api_config = config.api_config()
         atexit.register(DatabasePool.cleanup)  # Register the cleanup function to run on normal program termination.
+        ObservationTracker.STATE_STORE = config.progress_store
+        atexit.register(ObservationTracker.save_state)  # Persist change detection state even if the run is interrupted.
         
         logging.info(f"Script execution started at {datetime.now().replace(microsecond=0)}.")
-        resource_monitor_thread.start()
-
-        # Adjusted chunk size for optimized concurrent processing.
-        chunk_size = 1  # Update chunk size based on resource availability and processing requirements.
-        location_chunks = [locations[i:i + chunk_size] for i in range(0, len(locations), chunk_size)]
-
-        with DatabaseHandler() as database_handler:
-            database_handler.create_initial_schema()
-
-        SchemaManager.optimize_query_performance()
+        if config.resource_monitoring:
+            threading.Thread(target=monitor_resources, name='resource-monitor', daemon=True).start()
+        profiler_thread = MemoryProfiler.start(config.memory_profile_interval) if config.memory_profiling else None
 
-        # Create delayed tasks for each location processing.
-        delayed_tasks = [delayed(process_location)(WeatherDataFetcher(api_config), location) for location in locations]
+        try:
+            SchemaManager.migrate()
+            # Load spools left by earlier runs, whatever their number of processes, before any worker starts.
+            ObservationSpool.replay_all()
+        except (ValueError, OSError) as startup_error:
+            # Keep collecting; observations are spooled locally and the schema is migrated when the spool is replayed.
+            logging.warning(f"Database unavailable at startup, observations will be spooled: {startup_error}")
+
+        progress_store = ProgressStore(config.progress_store)
+        if config.processes > 1:
+            cycle_completed = run_workers(config.processes, config.config_file)
+        else:
+            collect_weather_data(api_config, LocationRegistry.from_file(config.location_file).locations, progress_store, config.concurrency, config.scheduler)
+            cycle_completed = True
 
-        # Execute the delayed tasks concurrently using Dask.
-        results = []
-        for chunk in location_chunks:
-            delayed_tasks = [delayed(process_location)(WeatherDataFetcher(api_config), location) for location in chunk]
-            results.extend(compute(*delayed_tasks))
+        # Only start a new cycle once every shard has finished, so an interrupted run resumes where it stopped.
+        if cycle_completed:
+            progress_store.reset()
 
         # Set the flag to indicate weather data collection is completed.
         global weather_data_collection_completed
         weather_data_collection_completed = True
+        if profiler_thread is not None:
+            MemoryProfiler.stop(profiler_thread)
 
         logging.info(f"Script execution completed at {datetime.now().replace(microsecond=0)}.")
 